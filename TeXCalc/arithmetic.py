@@ -0,0 +1,233 @@
+"""
+Residual contexts, which are left after processors, have only links to other contexts, constants and
+operations of addition, subtraction and multiplication, like '-@/3/@\\pm@/5/@*(@/1/@+@/2/@)'. They are parsed once
+into a tree of tuples and turned into python closures over numbers of any backend, so neither eval() nor
+conversions to strings are needed for computations.
+
+Tree nodes are:
+    ('operand', position)  - a value of the link at the position in the tuple of children's values
+    ('constant', name)  - a constant by its name
+    ('unary', sign, node)
+    ('binary', sign, left, right)
+where sign is an operator '+', '-', '*' or a number of a STATIC_OPERANDS option, like \\pm.
+"""
+import operator
+from itertools import product
+
+
+OPERATORS = {
+    '+': (operator.pos, operator.add),
+    '-': (operator.neg, operator.sub),
+    '*': (None, operator.mul),
+}
+
+
+class Parser:
+    """ Recursive descent parser of pieces of ContextProcessor's arithmetic: names, operators and sign options """
+
+    def __init__(self, pieces, arguments):
+        self._pieces = pieces
+        self._position = 0
+        self._arguments = {name: position for position, name in enumerate(arguments)}
+        self._options = 0  # count of sign options met
+
+    def __peek(self):
+        return self._pieces[self._position] if self._position < len(self._pieces) else None
+
+    def __next(self):
+        piece = self.__peek()
+        self._position += 1
+        return piece
+
+    def __sign(self, piece):
+        """ Returns a sign of additive operator or None """
+        if piece in ('+', '-'):
+            return piece
+
+        if isinstance(piece, tuple):
+            self._options += 1
+            return self._options - 1
+
+        return None
+
+    def __expression(self):
+        node = self.__term()
+
+        while True:
+            sign = self.__sign(self.__peek())
+            if sign is None:
+                return node
+
+            self.__next()
+            node = ('binary', sign, node, self.__term())
+
+    def __term(self):
+        node = self.__unary()
+
+        while self.__peek() == '*':
+            self.__next()
+            node = ('binary', '*', node, self.__unary())
+
+        return node
+
+    def __unary(self):
+        sign = self.__sign(self.__peek())
+
+        if sign is not None:
+            self.__next()
+            return 'unary', sign, self.__unary()
+
+        return self.__primary()
+
+    def __primary(self):
+        piece = self.__next()
+
+        if piece == '(':
+            node = self.__expression()
+
+            if self.__next() != ')':
+                raise SyntaxError("')' is expected")
+
+            return node
+
+        if not isinstance(piece, str) or piece in OPERATORS or piece == ')':
+            raise SyntaxError(f"an operand is expected instead of {piece}")
+
+        if piece in self._arguments:
+            return 'operand', self._arguments[piece]
+
+        return 'constant', piece
+
+    def parse(self):
+        node = self.__expression()
+
+        if self._position != len(self._pieces):
+            raise SyntaxError(f"unexpected {self.__peek()}")
+
+        return node
+
+
+def _operators(sign, signs):
+    """ Returns unary and binary functions of the sign, where a number of a sign option is replaced by its sign """
+    return OPERATORS[signs[sign] if isinstance(sign, int) else sign]
+
+
+def _leaf(node, constants, signs):
+    """ Returns ('operand', position), ('constant', value) or ('function', function) for the node """
+    if node[0] == 'operand':
+        return node
+    if node[0] == 'constant':
+        return 'constant', constants[node[1]]
+
+    return 'function', build(node, constants, signs)
+
+
+def _binary(function, left, right):
+    """ Leaves are inlined into a closure, so a call of it doesn't call closures of operands and constants """
+    (left_kind, left), (right_kind, right) = left, right
+
+    if left_kind == 'operand':
+        if right_kind == 'operand':
+            return lambda values: function(values[left], values[right])
+        if right_kind == 'constant':
+            return lambda values: function(values[left], right)
+        return lambda values: function(values[left], right(values))
+
+    if left_kind == 'constant':
+        if right_kind == 'operand':
+            return lambda values: function(left, values[right])
+        if right_kind == 'constant':
+            return lambda values: function(left, right)
+        return lambda values: function(left, right(values))
+
+    if right_kind == 'operand':
+        return lambda values: function(left(values), values[right])
+    if right_kind == 'constant':
+        return lambda values: function(left(values), right)
+    return lambda values: function(left(values), right(values))
+
+
+def build(node, constants, signs=()):
+    """ Returns a function of a tuple of children's values, which computes the node with given signs of options """
+    kind = node[0]
+
+    if kind == 'operand':
+        return operator.itemgetter(node[1])
+
+    if kind == 'constant':
+        value = constants[node[1]]
+        return lambda values: value
+
+    if kind == 'unary':
+        function = _operators(node[1], signs)[0]
+        argument_kind, argument = _leaf(node[2], constants, signs)
+
+        if argument_kind == 'operand':
+            return lambda values: function(values[argument])
+        if argument_kind == 'constant':
+            return lambda values: function(argument)
+        return lambda values: function(argument(values))
+
+    return _binary(
+        _operators(node[1], signs)[1],
+        _leaf(node[2], constants, signs),
+        _leaf(node[3], constants, signs)
+    )
+
+
+def source(node, operands, constants, signs=()):
+    """
+    Returns python source of the node with given signs of options, where operands and constants are sources of
+    operands by their positions and of constants by their names. See TeXCalc.codegen.
+    """
+    kind = node[0]
+
+    if kind == 'operand':
+        return operands[node[1]]
+
+    if kind == 'constant':
+        return constants[node[1]]
+
+    sign = signs[node[1]] if isinstance(node[1], int) else node[1]
+
+    if kind == 'unary':
+        return f"({sign}{source(node[2], operands, constants, signs)})"
+
+    return f"({source(node[2], operands, constants, signs)} {sign} {source(node[3], operands, constants, signs)})"
+
+
+def canonical(node, arguments, constants):
+    """
+    Returns the tree, where operands are replaced by their arguments and constants by their values, and operands of
+    commutative operations(+ and *, but not sign options) are sorted, so trees of a+b and b+a are equal.
+    Addition and multiplication of Decimal and float are commutative, but not associative, so (a+b)+c isn't
+    reordered.
+    """
+    kind = node[0]
+
+    if kind == 'operand':
+        return kind, arguments[node[1]]
+
+    if kind == 'constant':
+        return kind, str(constants[node[1]])
+
+    if kind == 'unary':
+        return kind, node[1], canonical(node[2], arguments, constants)
+
+    left, right = canonical(node[2], arguments, constants), canonical(node[3], arguments, constants)
+
+    if node[1] in ('+', '*'):
+        left, right = sorted((left, right), key=repr)
+
+    return kind, node[1], left, right
+
+
+def compile_functions(pieces, arguments, constants):
+    """
+    Parses pieces of an arithmetic context and returns functions of a tuple of values of arguments, one per each
+    combination of sign options(like \\pm). Raises SyntaxError if the pieces aren't an arithmetic expression.
+    """
+    options = [piece for piece in pieces if isinstance(piece, tuple)]
+    tree = Parser(pieces, arguments).parse()
+
+    return tuple([build(tree, constants, signs) for signs in product(*options)])
@@ -0,0 +1,231 @@
+import math
+from decimal import MAX_PREC, ROUND_HALF_EVEN, Context, Decimal
+
+from . import decimal_math
+from .exceptions import TeXCalcException
+
+
+ONE = Decimal(1)
+ROUNDING_CONTEXT = Context(prec=MAX_PREC, rounding=ROUND_HALF_EVEN)
+
+
+class Backend:
+    """
+    Numeric backend defines a type of numbers which TeXCalc computes on, and implementations of functions of
+    processors for that type. See Processor.bind to know how processors use them.
+    """
+    name = None
+
+    def __init__(self):
+        self.functions = {}
+
+    def number(self, value):
+        """ Converts a Decimal constant(or any value of a variable) to a number of the backend """
+        raise NotImplementedError
+
+    def elementwise(self, function):
+        """ Makes a function of backend's values from a function of python scalars """
+        return function
+
+    def batchwise(self, function):
+        """
+        Makes a function of backend's values from a function of a list of python scalars, which returns a list of
+        results, so a processor may compute all elements of an array at once. Scalar backends keep that function as
+        'many' attribute of the result, so a node computes values of all its ± branches by one call
+        """
+        def apply(value):
+            return function([value])[0]
+
+        apply.many = function
+        return apply
+
+    def round(self, value, ndigits):
+        """ Rounds a result to ndigits after the point """
+        return round(value, ndigits)
+
+
+class DecimalBackend(Backend):
+    """
+    Computes on Decimal numbers in the current decimal context, see TeXCalc.decimal_context. Transcendental
+    functions are computed by TeXCalc.decimal_math, so they have the precision of the context too.
+    """
+    name = 'decimal'
+
+    def __init__(self):
+        super(DecimalBackend, self).__init__()
+
+        self.functions = {
+            'sin': decimal_math.sin,
+            'cos': decimal_math.cos,
+            'tan': decimal_math.tan,
+            'cot': lambda x: ONE / decimal_math.tan(x),
+            'sec': lambda x: ONE / decimal_math.cos(x),
+            'csc': lambda x: ONE / decimal_math.sin(x),
+            'sinh': decimal_math.sinh,
+            'cosh': decimal_math.cosh,
+            'tanh': decimal_math.tanh,
+            'coth': lambda x: ONE / decimal_math.tanh(x),
+            'arcsin': decimal_math.asin,
+            'arccos': decimal_math.acos,
+            'arctan': decimal_math.atan,
+            'arccot': lambda x: decimal_math.pi() / 2 - decimal_math.atan(x),
+            'arcsec': lambda x: decimal_math.acos(ONE / x),
+            'arccsc': lambda x: decimal_math.asin(ONE / x),
+            'lg': lambda x, base: decimal_math.log10(x),
+            'ln': lambda x, base: decimal_math.ln(x),
+            'log': decimal_math.log,
+            'power': lambda x, exponent: Decimal(str(x)) ** Decimal(str(exponent)),
+            'root': self.root,
+        }
+
+    @staticmethod
+    def root(x, exponent):
+        if exponent <= 0 or (exponent % 2 == 0 and x < 0):
+            raise TeXCalcException.ComputeError.SqrtOfNegativeValue(exponent=exponent, value=x)
+
+        if exponent == 2:
+            return Decimal(str(x)).sqrt()
+
+        return Decimal(str(x)) ** (Decimal('1') / Decimal(str(exponent)))
+
+    def number(self, value):
+        if isinstance(value, Decimal):
+            return value
+
+        if isinstance(value, int):
+            return Decimal(value)  # ints may have more digits than str() allows
+
+        return Decimal(str(value))
+
+    def round(self, value, ndigits):
+        """ Rounds half to even, like round(), but a rounded value may have more digits than the current context """
+        return value.quantize(Decimal(1).scaleb(-ndigits), context=ROUNDING_CONTEXT)
+
+
+class FloatBackend(Backend):
+    """
+    Computes on python floats with math functions, without conversions to Decimal and back. It's much faster
+    than DecimalBackend, when float64 accuracy is enough.
+    """
+    name = 'float'
+
+    def __init__(self):
+        super(FloatBackend, self).__init__()
+
+        self.functions = {
+            'sin': math.sin,
+            'cos': math.cos,
+            'tan': math.tan,
+            'cot': lambda x: 1 / math.tan(x),
+            'sec': lambda x: 1 / math.cos(x),
+            'csc': lambda x: 1 / math.sin(x),
+            'sinh': math.sinh,
+            'cosh': math.cosh,
+            'tanh': math.tanh,
+            'coth': lambda x: 1 / math.tanh(x),
+            'arcsin': math.asin,
+            'arccos': math.acos,
+            'arctan': math.atan,
+            'arccot': lambda x: math.pi / 2 - math.atan(x),
+            'arcsec': lambda x: math.acos(1 / x),
+            'arccsc': lambda x: math.asin(1 / x),
+            'lg': lambda x, base: math.log10(x),
+            'ln': lambda x, base: math.log(x),
+            'log': math.log,
+            'power': math.pow,
+            'root': self.root,
+        }
+
+    @staticmethod
+    def root(x, exponent):
+        if exponent <= 0 or (exponent % 2 == 0 and x < 0):
+            raise TeXCalcException.ComputeError.SqrtOfNegativeValue(exponent=exponent, value=x)
+
+        if exponent == 2:
+            return math.sqrt(x)
+
+        return math.pow(x, 1 / exponent)
+
+    def number(self, value):
+        return float(value)
+
+
+class NumpyBackend(Backend):
+    """
+    Computes on numpy arrays of float64, so a whole batch of variables' values is processed with a single
+    call of numpy ufunc per node. Invalid operations give nan instead of raising.
+    """
+    name = 'numpy'
+
+    def __init__(self):
+        super(NumpyBackend, self).__init__()
+
+        try:
+            import numpy
+        except ImportError:
+            raise TeXCalcException.BackendError.NotInstalled(backend=self.name, package='numpy')
+
+        self.numpy = numpy
+        self.functions = {
+            'sin': numpy.sin,
+            'cos': numpy.cos,
+            'tan': numpy.tan,
+            'cot': lambda x: 1 / numpy.tan(x),
+            'sec': lambda x: 1 / numpy.cos(x),
+            'csc': lambda x: 1 / numpy.sin(x),
+            'sinh': numpy.sinh,
+            'cosh': numpy.cosh,
+            'tanh': numpy.tanh,
+            'coth': lambda x: 1 / numpy.tanh(x),
+            'arcsin': numpy.arcsin,
+            'arccos': numpy.arccos,
+            'arctan': numpy.arctan,
+            'arccot': lambda x: numpy.pi / 2 - numpy.arctan(x),
+            'arcsec': lambda x: numpy.arccos(1 / x),
+            'arccsc': lambda x: numpy.arcsin(1 / x),
+            'lg': lambda x, base: numpy.log10(x),
+            'ln': lambda x, base: numpy.log(x),
+            'log': lambda x, base: numpy.log(x) / numpy.log(base),
+            'power': numpy.power,
+            'root': lambda x, exponent: numpy.power(x, 1 / exponent),
+        }
+
+    def number(self, value):
+        return self.numpy.float64(value)
+
+    def array(self, value):
+        return self.numpy.asarray(value, dtype=self.numpy.float64)
+
+    def elementwise(self, function):
+        """ Makes an array function from a function of python scalars, for processors without Processor.bind """
+        return self.numpy.vectorize(function, otypes=[self.numpy.float64])
+
+    def batchwise(self, function):
+        def apply(value):
+            value = self.array(value)
+            return self.array(function(value.ravel().tolist())).reshape(value.shape)
+
+        return apply
+
+
+backends = {
+    DecimalBackend.name: DecimalBackend,
+    FloatBackend.name: FloatBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name):
+    """ Returns a shared instance of the backend by its name """
+    if name not in _instances:
+        if name not in backends:
+            raise TeXCalcException.BackendError.NotSupported(backend=name, supported=tuple(backends.keys()))
+
+        _instances[name] = backends[name]()
+
+    return _instances[name]
+
+
+decimal_backend = get_backend(DecimalBackend.name)
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+
+from .exceptions import TeXCalcException
+
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'currsize', 'maxsize'))
+
+
+class Cache:
+    """
+    Unbounded cache of computations results of a node. Every node of TeXCalc._context_map has its own cache,
+    which is created by TeXCalc instance by its cache policy, see TeXCalc.make_cache.
+    Values are never None, so get() returns None when there is no such key.
+
+    Caches are shared by all threads which call the TeXCalc instance, so get, set and clear are serialized by
+    a lock of the cache, and subclasses implement them in _get, _set and _clear.
+    """
+    name = 'unbounded'
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _get(self, key):
+        value = self._data.get(key, None)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def _set(self, key, value):
+        self._data[key] = value
+
+    def _clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self), self.maxsize)
+
+
+class LRUCache(Cache):
+    """ Evicts the least recently used result, when there are more than maxsize results """
+    name = 'lru'
+
+    def __init__(self, maxsize=None, ttl=None):
+        super(LRUCache, self).__init__(maxsize=maxsize, ttl=ttl)
+        self._data = OrderedDict()
+
+    def _get(self, key):
+        value = self._data.get(key, None)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+
+        return value
+
+    def _set(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+class LFUCache(Cache):
+    """ Evicts the least frequently used result(the oldest one of them), when there are more than maxsize results """
+    name = 'lfu'
+
+    def __init__(self, maxsize=None, ttl=None):
+        super(LFUCache, self).__init__(maxsize=maxsize, ttl=ttl)
+        self._frequencies = {}
+        self._buckets = defaultdict(OrderedDict)  # frequency: keys in order of usage
+        self._min_frequency = 0
+
+    def __touch(self, key):
+        frequency = self._frequencies[key]
+        bucket = self._buckets[frequency]
+
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+
+            if self._min_frequency == frequency:
+                self._min_frequency += 1
+
+        self._frequencies[key] = frequency + 1
+        self._buckets[frequency + 1][key] = None
+
+    def _get(self, key):
+        value = self._data.get(key, None)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__touch(key)
+
+        return value
+
+    def _set(self, key, value):
+        if key in self._data:
+            self._data[key] = value
+            self.__touch(key)
+            return
+
+        if self.maxsize is not None and len(self._data) >= self.maxsize:
+            if self.maxsize <= 0:
+                return
+
+            bucket = self._buckets[self._min_frequency]
+            evicted, _ = bucket.popitem(last=False)
+
+            if not bucket:
+                del self._buckets[self._min_frequency]
+
+            del self._data[evicted]
+            del self._frequencies[evicted]
+            self.evictions += 1
+
+        self._data[key] = value
+        self._frequencies[key] = 1
+        self._buckets[1][key] = None
+        self._min_frequency = 1
+
+    def _clear(self):
+        super(LFUCache, self)._clear()
+        self._frequencies.clear()
+        self._buckets.clear()
+        self._min_frequency = 0
+
+
+class TTLCache(Cache):
+    """ Results expire in ttl seconds after they were computed. The oldest results are evicted over maxsize """
+    name = 'ttl'
+
+    def __contains__(self, key):
+        item = self._data.get(key, None)
+        return item is not None and item[0] > time.monotonic()
+
+    def _get(self, key):
+        item = self._data.get(key, None)
+
+        if item is not None and item[0] <= time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            item = None
+
+        if item is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return item[1]
+
+    def _set(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            del self._data[next(iter(self._data))]
+            self.evictions += 1
+
+
+class NoCache(Cache):
+    """ Disabled cache, each computation is a miss. It has nothing to protect, so it doesn't lock """
+    name = 'disabled'
+
+    def __contains__(self, key):
+        return False
+
+    def get(self, key):
+        self.misses += 1
+
+    def set(self, key, value):
+        pass
+
+
+caches = {
+    cache.name: cache
+    for cache in (Cache, LRUCache, LFUCache, TTLCache, NoCache)
+}
+
+
+def get_cache_class(policy):
+    """ Returns a class of cache by policy, which is a name from caches, a subclass of Cache or None to disable """
+    if policy is None or policy is False:
+        return NoCache
+
+    if isinstance(policy, type) and issubclass(policy, Cache):
+        return policy
+
+    if policy not in caches:
+        raise TeXCalcException.InitError.BadCachePolicy(policy=policy, supported=tuple(caches.keys()))
+
+    return caches[policy]
@@ -0,0 +1,240 @@
+"""
+Generates a python module with a single straight-line function of the expression, see TeXCalc.to_python_source.
+Variables are positional arguments, each node is a local, and a node with several ± branches is a tuple of their
+values in order of the kernels of ContextProcessor. Functions of processors are taken from the backend once, on
+import of the module, so a call of the function neither looks up nodes nor caches, and the module may be written
+to a file and imported later. Processors, which codegen doesn't know, are loaded from their dumped fields, so
+they must be importable, like for TeXCalc.sweep.
+"""
+from importlib import import_module
+from itertools import product
+
+from . import arithmetic
+from .backends import get_backend
+from .exceptions import TeXCalcException
+from .processors import (
+    Constant,
+    Exponentiation,
+    Fraction,
+    InverseTrigFunction,
+    Logarithm,
+    Sqrt,
+    TrigFunction,
+    processor_name,
+)
+
+
+# processors, which are calls of functions of backends, and names of their functions
+BACKEND_FUNCTIONS = {
+    TrigFunction: lambda processor: processor.function['choice'],
+    InverseTrigFunction: lambda processor: processor.function['choice'],
+    Logarithm: lambda processor: processor.function['choice'],
+    Exponentiation: lambda processor: 'power',
+    Sqrt: lambda processor: 'root',
+}
+
+
+def load_processor(name, fields, backend_name):
+    """ Imports a processor class by its name(see processor_name), loads it from fields and binds the backend """
+    module, qualname = name.split(':')
+    processor_class = import_module(module)
+
+    for attribute in qualname.split('.'):
+        processor_class = getattr(processor_class, attribute)
+
+    return processor_class.load(fields).bind(get_backend(backend_name))
+
+
+class Generator:
+    """ Collects lines of the module, see generate """
+
+    def __init__(self, texcalc_instance, backend, name):
+        self._func = texcalc_instance
+        self._backend = backend
+        self._name = name
+        self._header = []  # lines of the module before the function
+        self._body = []  # lines of the function
+        self._globals = {}  # a source of a global value: its name
+        self._locals = {}  # index: a source of the node's value
+        self._sizes = {}  # index: a number of values of the node, a node with more than one value is a tuple
+
+    def __global(self, value_source, prefix):
+        if value_source not in self._globals:
+            self._globals[value_source] = f"{prefix}{len(self._globals)}"
+            self._header.append(f"{self._globals[value_source]} = {value_source}")
+
+        return self._globals[value_source]
+
+    def __constant(self, value):
+        if value is None:
+            return 'None'
+
+        if self._backend.name == 'float':
+            return repr(float(value))
+
+        return self.__global(f"_number({str(value)!r})", '_c')
+
+    def __function(self, name):
+        return self.__global(f"_backend.functions[{name!r}]", f'_{name}')
+
+    def __not_generatable(self, context_processor, reason):
+        return TeXCalcException.ComputeError.NotGeneratable(
+            context=context_processor._context,
+            index=context_processor._index,
+            reason=reason
+        )
+
+    def __assign(self, index, occurrences, expressions):
+        """
+        Assigns the node's value to a local, where expressions are sources of its values, one per combination of
+        signs, in terms of children's values: locals of single values, or items of tuples in loops. Occurrences
+        are pairs of a child and a name of its loop variable, in order of the product of the node's kernel, see
+        ContextProcessor._occurrences, so values go in the same order as values of a call.
+        """
+        several = [(child, name) for child, name in occurrences if self._sizes[child] > 1]
+        self._sizes[index] = len(expressions)
+
+        for child, _ in several:
+            self._sizes[index] *= self._sizes[child]
+
+        if self._sizes[index] == 1:
+            value = expressions[0]
+        elif not several:
+            value = f"({', '.join(expressions)},)"
+        else:
+            loops = " ".join([f"for {name} in v{child}" for child, name in several])
+            value = ", ".join([f"*[{expression} {loops}]" for expression in expressions])
+            value = f"({value},)"
+
+        self._locals[index] = f"v{index}"
+        self._body.append(f"v{index} = {value}")
+
+    def __operand(self, child, name):
+        """ A source of the child's value inside of expressions of its parent, name is its loop variable """
+        return name if self._sizes[child] > 1 else self._locals[child]
+
+    def __processor(self, context_processor):
+        processor = context_processor._processor
+        processor_class = type(processor)
+
+        if processor.bind(self._backend) is None:
+            raise self.__not_generatable(context_processor, "its processor can be computed only by compute")
+
+        try:
+            sources = processor.operand_sources(
+                {index: None for index in context_processor._indices},
+                self._backend,
+                index=context_processor._index
+            )
+        except TeXCalcException.ComputeError:
+            raise self.__not_generatable(context_processor, "its operands can't be computed")
+
+        # each operand is an occurrence of its child, as the kernel takes the product over operands
+        occurrences = [(source, f"x{source}_{position}") for position, source in enumerate(sources)]
+        operands = [
+            self.__operand(*occurrence) if isinstance(occurrence[0], int)
+            else self.__constant(getattr(processor, operand)['value'])
+            for occurrence, operand in zip(occurrences, processor.operands)
+        ]
+        occurrences = [occurrence for occurrence in occurrences if isinstance(occurrence[0], int)]
+
+        if processor_class is Constant:
+            self._sizes[context_processor._index] = 1
+            self._locals[context_processor._index] = operands[0]
+            return
+
+        if processor_class is Fraction:
+            expression = f"{operands[0]} / {operands[1]}"
+        elif processor_class in BACKEND_FUNCTIONS:
+            function = self.__function(BACKEND_FUNCTIONS[processor_class](processor))
+            expression = f"{function}({', '.join(operands)})"
+        else:
+            function = self.__global(
+                f"_load_processor({processor_name(processor_class)!r}, {processor.dump()!r}, {self._backend.name!r})",
+                '_processor'
+            )
+            expression = f"{function}({', '.join(operands)})"
+
+        self.__assign(context_processor._index, occurrences, [expression])
+
+    def __arithmetic(self, context_processor):
+        pieces = context_processor._arithmetic[0]
+        children = sorted(context_processor._indices)
+
+        try:
+            tree = arithmetic.Parser(pieces, [f"_{index}" for index in children]).parse()
+        except SyntaxError as error:
+            raise self.__not_generatable(context_processor, str(error))
+
+        occurrences = [(child, f"x{child}") for child in children]
+        operands = [self.__operand(*occurrence) for occurrence in occurrences]
+        constants = {name: self.__constant(value) for name, value in context_processor.arithmetic_constants().items()}
+        options = [piece for piece in pieces if isinstance(piece, tuple)]
+
+        self.__assign(context_processor._index, occurrences, [
+            arithmetic.source(tree, operands, constants, signs)
+            for signs in product(*options)
+        ])
+
+    def generate(self):
+        func = self._func
+        variables = func._vars or ()
+
+        if not self._name.isidentifier() or not all([name.isidentifier() for name in variables]):
+            raise TeXCalcException.UserError.BadFunctionName(name=self._name, variables=variables)
+
+        for index in func._order:
+            context_processor = func._context_map[index]
+
+            if context_processor._kernel is None:
+                context_processor.compile()
+
+            if context_processor._is_async:
+                raise self.__not_generatable(context_processor, "its processor computes asynchronously")
+
+            if context_processor._processor is not None:
+                self.__processor(context_processor)
+            elif context_processor.is_variable:
+                self._sizes[index] = 1
+                self._locals[index] = context_processor._context
+            elif context_processor._arithmetic is not None:
+                self.__arithmetic(context_processor)
+            else:
+                raise self.__not_generatable(context_processor, "it isn't a valid arithmetic expression")
+
+        if self._sizes[0] == 1:
+            result = f"({self._locals[0]},)"
+        elif self._backend.name == 'numpy':
+            result = self._locals[0]  # arrays aren't hashable, so branches aren't deduplicated, like evaluate_batch
+        else:
+            result = f"tuple(dict.fromkeys({self._locals[0]}))"
+
+        number = '_backend.array' if self._backend.name == 'numpy' else '_backend.number'
+        arguments = ", ".join(variables)
+
+        return "\n".join([
+            f"# Generated by TeXCalc from {func._TeXCalc__expr!r}",
+            "from TeXCalc.backends import get_backend",
+            "from TeXCalc.codegen import load_processor as _load_processor",
+            "",
+            f"_backend = get_backend({self._backend.name!r})",
+            f"_number = {number}",
+            *self._header,
+            "",
+            "",
+            f"def {self._name}({arguments}):",
+            *[f"    {name} = _number({name})" for name in variables],
+            *[f"    {line}" for line in self._body],
+            f"    return {result}",
+            "",
+        ])
+
+
+def generate(texcalc_instance, backend=None, name='texcalc'):
+    """ Returns source of a module with a function of the TeXCalc instance by the name """
+    func = texcalc_instance
+
+    if func._compiled_context_map is not func._context_map:
+        func.compile_context_map()
+
+    return Generator(func, get_backend(backend) if backend is not None else func._backend, name).generate()
@@ -1,18 +1,42 @@
+import asyncio
 import re
-from decimal import Decimal
-
+import threading
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from decimal import getcontext, localcontext
+from itertools import product
+
+from . import codegen, decimal_math, optimizer, parallel, serialization
+from .backends import get_backend
+from .cache import CacheInfo, LRUCache, TTLCache, get_cache_class
+from .dual import Dual, get_dual_backend, unpack
 from .exceptions import TeXCalcException
-from .defines import reserved_words
+from .parser import Parser
+from .profiler import Profiler
+from .defines import (
+    reserved_words,
+    DEFAULT_BACKEND,
+    DEFAULT_CACHE_POLICY,
+    DEFAULT_CACHE_MAXSIZE,
+    DEFAULT_MAP_CHUNKSIZE,
+    DEFAULT_SWEEP_CHUNKSIZE,
+    DEFAULT_STREAM_CONCURRENCY,
+    COMPILED_CACHE_MAXSIZE
+)
 from .processors import (
     Processor,
     ContextProcessor,
+    CustomFunction,
     Sqrt,
     Exponentiation,
     TrigFunction,
     InverseTrigFunction,
     Constant,
     Fraction,
-    Logarithm
+    Logarithm,
+    distinct
 )
 
 
@@ -43,12 +67,35 @@ class TeXCalc:
 
     ... result = func(a=-2.34, b=4.87, c=13, round=3)  # result = (-1.536, 3.617)
     It's the simplest way to use TeXCalc. 'round' param is to what number we should round results.
+
+    ... func = TeXCalc("\\sqrt{x}", variables=('x',), cache='lfu', cache_maxsize=100)
+    Results of each node are cached by the policy: 'lru'(default), 'lfu', 'ttl'(with cache_ttl in seconds),
+    'unbounded', None to disable, or your own subclass of TeXCalc.cache.Cache.
+    See func.cache_info() and func.cache_clear().
+
+    ... func = TeXCalc("\\sin{x}\\cos{x}", variables=('x',), backend='float')
+    Values are Decimal by default(backend='decimal'), while 'float' backend computes on python floats with
+    math functions, which is much faster when float64 accuracy is enough.
+
+    ... roots = func(a=1, b=-8, c=15), func(a=1, b=-8, c=15, branch=1)  # (5, 3), (3,)
+    Values of ± branches are distinct and go in order of branches, the first one is computed with all first signs.
+    A single branch is computed by its number, see TeXCalc.branch_count.
+
+    ... func = TeXCalc("\\frac{x}{3}", variables=('x',), precision=50, rounding=decimal.ROUND_DOWN)
+    Decimal values are computed in a local decimal context with the precision and rounding of the instance,
+    or of a call, like func(x=1, precision=100). Global decimal context is used if they aren't passed.
+    So instances with different precisions can compute concurrently.
     """
 
-    pi = ContextProcessor.STATIC_OPERANDS[r"\\pi"][0]
+    pi = decimal_math.pi()
 
     DEFAULT_ROUND = 5
 
+    _compiled = LRUCache(maxsize=COMPILED_CACHE_MAXSIZE)  # process-wide cache of TeXCalc.compile
+    _shared = False  # instances of TeXCalc.compile are read-only
+
+    OPTIONS = ('backend', 'precision', 'rounding', 'cache', 'cache_maxsize', 'cache_ttl', 'optimize')
+
     def __init__(self, expression=None, variables=None, context_map=None, **kwargs):
         if variables:
             if (
@@ -64,11 +111,24 @@ class TeXCalc:
         if not kwargs.get('skip_context_processing', None) and context_map:
             raise TeXCalcException.InitError.BadArguments()
 
+        self._options = {key: value for key, value in kwargs.items() if key in self.OPTIONS}
+        self._backend = get_backend(kwargs.get('backend', DEFAULT_BACKEND))
+        self._precision = kwargs.get('precision', None)
+        self._rounding = kwargs.get('rounding', None)
+        self.decimal_context()  # validates precision and rounding
+        self._cache_class = get_cache_class(kwargs.get('cache', DEFAULT_CACHE_POLICY))
+        self._cache_maxsize = kwargs.get('cache_maxsize', DEFAULT_CACHE_MAXSIZE)
+        self._cache_ttl = kwargs.get('cache_ttl', None)
+
+        if issubclass(self._cache_class, TTLCache) and self._cache_ttl is None:
+            raise TeXCalcException.InitError.BadCachePolicy(policy=self._cache_class.name, supported='cache_ttl')
+
         self.__expr = expression if not context_map else None
         self._context_map = context_map if not expression else None
 
+        self._custom_processors = tuple(kwargs.get('custom_processors', []))
         self._processors = (
-            *kwargs.get('custom_processors', []),
+            *self._custom_processors,
             Sqrt,
             Exponentiation,
             Logarithm,
@@ -94,22 +154,132 @@ class TeXCalc:
         if not self._vars and self.__expr and not self.__is_immutable():
             raise TeXCalcException.InitError.NotAConst()
 
+        self._compiled_context_map = None
+        self._compile_lock = threading.Lock()
+
         if not kwargs.get('skip_context_processing', None):
             self.__make_context_map()
+            self.compile_context_map()
+
+            if kwargs.get('optimize', False):
+                self.optimize()
+
+    @classmethod
+    def compile(cls, expression, variables=None, custom_processors=(), **kwargs):
+        """
+        ... func = TeXCalc.compile("\\frac{-b\\pm\\sqrt{b^{2}-4ac}}{2a}", variables=('a', 'b', 'c'))
+        Returns a TeXCalc instance shared by all callers with the same expression, variables, custom processors
+        and options, like re.compile does. Only the first call parses the expression, and the returned instance
+        is read-only: its optimize, profile, cache_clear and compile_context_map raise UserError.SharedInstance.
+        The cache is bounded by COMPILED_CACHE_MAXSIZE expressions.
+        """
+        key = (cls, expression, variables, tuple(custom_processors), tuple(sorted(kwargs.items())))
+
+        func = cls._compiled.get(key)
+
+        if func is None:
+            func = cls(expression, variables=variables, custom_processors=custom_processors, **kwargs)
+            func._shared = True
+
+            cls._compiled.set(key, func)
+
+        return func
+
+    @classmethod
+    def compile_cache_info(cls):
+        return cls._compiled.info()
+
+    @classmethod
+    def compile_cache_clear(cls):
+        cls._compiled.clear()
+
+    def dumps(self):
+        """
+        ... TeXCalc.loads(func.dumps(), custom_processors=(FibonacciFunction,))
+        Returns the compiled expression as a compact versioned json string, which is loaded without any parsing.
+        """
+        return serialization.dumps(self)
+
+    def dump(self, fp):
+        fp.write(self.dumps())
+
+    @classmethod
+    def loads(cls, data, custom_processors=(), **kwargs):
+        """ Creates a TeXCalc instance from a string made by TeXCalc.dumps, kwargs are options like cache """
+        return serialization.loads(cls, data, custom_processors=custom_processors, **kwargs)
+
+    @classmethod
+    def load(cls, fp, custom_processors=(), **kwargs):
+        return cls.loads(fp.read(), custom_processors=custom_processors, **kwargs)
+
+    def __reduce__(self):
+        """
+        Instances are pickled as their compiled expressions made by TeXCalc.dumps with options, so neither caches
+        nor locks are pickled, and unpickling doesn't parse the expression.
+        """
+        return serialization.restore, (type(self), self.dumps(), self._custom_processors, self._options)
 
     def __call__(self, **kwargs):
-        if self._context_map is None:
-            raise TeXCalcException.InvalidContextMap.NotDefined()
+        vars_dict, computation_key = self.__prepare_variables(kwargs)
+        branch = kwargs.get('branch', None)
+
+        with self.decimal_context(precision=kwargs.get('precision', None), rounding=kwargs.get('rounding', None)):
+            if branch is None:
+                answers = self._context_map[0]._evaluate(vars_dict, computation_key)
+            else:
+                answers = self.__evaluate_branch(vars_dict, computation_key, branch)
+
+        return tuple([self._backend.round(answer, kwargs.get('round', self.DEFAULT_ROUND)) for answer in answers])
 
-        if not isinstance(self._context_map, dict):
-            raise TeXCalcException.InvalidContextMap.NotDict(wrong_type=type(self._context_map))
+    async def acompute(self, **kwargs):
+        """
+        ... result = await func.acompute(a=-2.34, b=4.87, c=13, round=3)
+        Computes the expression like a call of the instance, but awaits processors with async compute, so
+        the event loop isn't blocked by them. Independent subtrees with such processors are awaited concurrently.
+        """
+        vars_dict, computation_key = self.__prepare_variables(kwargs)
 
-        for k, v in self._context_map.items():
-            if not isinstance(k, int):
-                raise TeXCalcException.InvalidContextMap.NotIntegerIndex(wrong_type=type(k))
+        with self.decimal_context(precision=kwargs.get('precision', None), rounding=kwargs.get('rounding', None)):
+            answers = await self._context_map[0]._aevaluate(vars_dict, computation_key, {})
 
-            if not isinstance(v, ContextProcessor):
-                raise TeXCalcException.InvalidContextMap.NotContextProcessor(wrong_type=type(v))
+        return tuple([self._backend.round(answer, kwargs.get('round', self.DEFAULT_ROUND)) for answer in answers])
+
+    async def astream(self, rows, concurrency=DEFAULT_STREAM_CONCURRENCY, **kwargs):
+        """
+        ... async for roots in func.astream(rows): ...
+        Yields results of TeXCalc.acompute for rows(an iterable or an async iterable of dicts, or sequences in
+        order of variables) in order of rows. At most concurrency rows are computed at once.
+        """
+        pending = deque()
+
+        async def compute(row):
+            return await self.acompute(**self.__row_variables(row), **kwargs)
+
+        if not hasattr(rows, '__aiter__'):
+            rows = self.__aiter(rows)
+
+        async for row in rows:
+            pending.append(asyncio.ensure_future(compute(row)))
+
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+
+        while pending:
+            yield await pending.popleft()
+
+    @staticmethod
+    async def __aiter(rows):
+        for row in rows:
+            yield row
+
+    def __row_variables(self, row):
+        """ Returns a dict of variables' values of a row, which is a dict or a sequence in order of variables """
+        return row if isinstance(row, Mapping) else dict(zip(self._vars, row))
+
+    def __prepare_variables(self, kwargs):
+        """ Returns a dict of variables' values converted to the backend and a computation key of a call """
+        if self._compiled_context_map is not self._context_map:
+            self.compile_context_map()
 
         vars_dict = {}
         for var_name in self._vars:
@@ -117,16 +287,486 @@ class TeXCalc:
                 raise TeXCalcException.UserError.NotEnoughVariables(var_name=var_name)
 
             try:
-                vars_dict[var_name] = Decimal(str(kwargs[var_name]))
+                vars_dict[var_name] = self._backend.number(kwargs[var_name])
             except:
                 raise TeXCalcException.UserError.NotDecimal(
                     wrong_var_name=var_name,
                     wrong_var=kwargs[var_name]
                 )
 
+        precision, rounding = kwargs.get('precision', None), kwargs.get('rounding', None)
+        computation_key = (
+            *[str(kwargs[var_name]) for var_name in self._vars],
+            # results differ in other decimal contexts
+            (precision, rounding) if precision is not None or rounding is not None else None
+        )
+
+        return vars_dict, computation_key
+
+    @property
+    def branch_count(self):
+        """
+        A number of branches of the expression, which are values of its nodes before deduplication, see
+        TeXCalc.__evaluate_branch. Each occurrence of a subexpression with ± signs has its own signs.
+        """
+        if self._compiled_context_map is not self._context_map:
+            self.compile_context_map()
+
+        return self._branch_counts[0]
+
+    def __evaluate_branch(self, variables, key, branch):
+        """
+        Computes a single branch of the expression, so each node computes one value, instead of values of all
+        combinations of ± signs of its subtree. Branches are numbered in order of values of a full computation,
+        so its result is the distinct values of branches from 0 to TeXCalc.branch_count - 1.
+        """
+        if not isinstance(branch, int) or not 0 <= branch < self._branch_counts[0]:
+            raise TeXCalcException.UserError.BadBranch(branch=branch, count=self._branch_counts[0])
+
+        return self.__branch_value(0, variables, key, branch, {}),
+
+    def __branch_value(self, index, variables, key, branch, computed):
+        """
+        Computes a value of the node in its branch, which is a number in a mixed radix: the highest digit is
+        a combination of ± signs of the node, then a branch per each occurrence of a child in order of the product
+        of the kernel(see ContextProcessor._occurrences), the last one is the lowest digit.
+        Subtrees without ± signs are evaluated through caches of their nodes, like in a full computation, and other
+        subtrees are computed once per their branch in a call, computed is a dict of their values by both.
+        """
+        context_processor = self._context_map[index]
+
+        if self._branch_counts[index] == 1:
+            return context_processor._evaluate(variables, key)[0]
+
+        computed_key = index, branch
+        if computed_key in computed:
+            return computed[computed_key]
+
+        if context_processor._is_async:
+            return context_processor._kernel(variables, None)  # raises AsyncProcessor
+
+        digits = []
+        for child in reversed(context_processor._occurrences):
+            branch, digit = divmod(branch, self._branch_counts[child])
+            digits.append(digit)
+
+        values = [
+            self.__branch_value(child, variables, key, digit, computed)
+            for child, digit in zip(context_processor._occurrences, reversed(digits))
+        ]
+
+        computed[computed_key] = context_processor._single(values, variables, branch)
+        return computed[computed_key]
+
+    def map(self, rows, executor=None, chunksize=DEFAULT_MAP_CHUNKSIZE, **kwargs):
+        """
+        ... results = func.map([{'a': 1, 'b': -8, 'c': 15}, (1, 5, 6)], executor=ThreadPoolExecutor(8))
+        Computes the expression for each row of variables' values(a dict, or a sequence in order of variables)
+        and returns a list of results in order of rows. Rows are split into chunks of chunksize, which are
+        computed by the executor, or by a temporary thread pool. Kwargs are options of calls, like round.
+        """
+        rows = list(rows)
+        chunks = [rows[i:i + chunksize] for i in range(0, len(rows), chunksize)]
+
+        if executor is None:
+            with ThreadPoolExecutor() as executor:
+                return self.map(rows, executor=executor, chunksize=chunksize, **kwargs)
+
+        results = []
+        for chunk_results in executor.map(self._compute_rows, chunks, [kwargs] * len(chunks)):
+            results.extend(chunk_results)
+
+        return results
+
+    def sweep(self, rows, processes=None, chunksize=DEFAULT_SWEEP_CHUNKSIZE, **kwargs):
+        """
+        ... for roots in func.sweep(((1, -b, 6) for b in range(5, 10 ** 7)), processes=8): ...
+        Like TeXCalc.map, but chunks of rows are computed by a pool of processes, each of them gets the compiled
+        expression once on its start. Rows are read lazily and results are yielded in order of rows.
+        Custom processors must be importable by workers.
+        """
+        return parallel.sweep(self, rows, processes=processes, chunksize=chunksize, **kwargs)
+
+    def imap(self, rows, chunk=DEFAULT_MAP_CHUNKSIZE, cache=True, **kwargs):
+        """
+        ... for roots in func.imap(((1, -b, 6) for b in range(5, 10 ** 7)), cache=False): ...
+        Yields results for rows(dicts, or sequences in order of variables) as they arrive, reading at most chunk
+        rows at once, so memory doesn't depend on a number of rows. With cache=False results are neither looked up
+        nor stored in caches of nodes, while each node is still computed once per row.
+        """
+        precision, rounding = kwargs.get('precision', None), kwargs.get('rounding', None)
+        ndigits = kwargs.get('round', self.DEFAULT_ROUND)
+
+        for rows_chunk in parallel.chunks_of(rows, chunk):
+            if cache:
+                yield from self._compute_rows(rows_chunk, kwargs)
+                continue
+
+            for row in rows_chunk:
+                vars_dict, _ = self.__prepare_variables(self.__row_variables(row))
+
+                with self.decimal_context(precision=precision, rounding=rounding):
+                    answers = self.__evaluate_uncached(vars_dict)
+
+                yield tuple([self._backend.round(answer, ndigits) for answer in answers])
+
+    def __evaluate_uncached(self, variables):
+        """ Computes nodes in order of TeXCalc._order by their combining functions, without caches """
+        values = {}
+
+        for index in self._order:
+            context_processor = self._context_map[index]
+
+            if context_processor._is_async:
+                return context_processor._kernel(variables, None)  # raises AsyncProcessor
+
+            values[index] = distinct(context_processor._combine(
+                {i: values[i] for i in context_processor._indices},
+                variables
+            ))
+
+        return values[0]
+
+    def grid(self, **kwargs):
+        """
+        ... results = func.grid(a=[1, 2], b=range(-10, -5), c=[3, 4, 5], round=3)
+        Computes the expression on the cartesian product of variables' values and returns a list of results in
+        order of itertools.product(*axes), where axes go in order of variables. A single value is an axis of one
+        point. Each node is computed once per combination of values of variables used in its subtree, so its
+        values are reused for all points, where only other variables change.
+        """
+        if self._compiled_context_map is not self._context_map:
+            self.compile_context_map()
+
+        axes = {}
+        for var_name in self._vars or ():
+            if var_name not in kwargs:
+                raise TeXCalcException.UserError.NotEnoughVariables(var_name=var_name)
+
+            points = kwargs[var_name]
+            if isinstance(points, str) or not hasattr(points, '__iter__'):
+                points = (points,)
+
+            try:
+                axes[var_name] = [self._backend.number(point) for point in points]
+            except:
+                raise TeXCalcException.UserError.NotDecimal(wrong_var_name=var_name, wrong_var=points)
+
+        values = {}  # index: {positions on axes of variables used by the node: values}
+
+        with self.decimal_context(precision=kwargs.get('precision', None), rounding=kwargs.get('rounding', None)):
+            for index in self._order:
+                values[index] = self.__compute_on_grid(self._context_map[index], axes, values)
+
+        ndigits = kwargs.get('round', self.DEFAULT_ROUND)
+        answers = {
+            positions: tuple([self._backend.round(answer, ndigits) for answer in node_values])
+            for positions, node_values in values[0].items()
+        }
+        projection = [list(axes.keys()).index(var) for var in self._context_map[0]._used_vars]
+
+        return [
+            answers[tuple([point[i] for i in projection])]
+            for point in product(*[range(len(points)) for points in axes.values()])
+        ]
+
+    def __compute_on_grid(self, context_processor, axes, values):
+        """ Computes the node on each combination of values of its variables, children are already computed """
+        if context_processor._is_async:
+            context_processor._kernel(None, None)  # raises AsyncProcessor
+
+        used_vars = context_processor._used_vars
+        projections = {
+            child: [used_vars.index(var) for var in self._context_map[child]._used_vars]
+            for child in context_processor._indices
+        }
+        node_values = {}
+
+        for positions in product(*[range(len(axes[var])) for var in used_vars]):
+            node_values[positions] = distinct(context_processor._combine(
+                {
+                    child: values[child][tuple([positions[i] for i in projection])]
+                    for child, projection in projections.items()
+                },
+                {var: axes[var][position] for var, position in zip(used_vars, positions)}
+            ))
+
+        return node_values
+
+    def _compute_rows(self, rows, options):
+        return [self(**self.__row_variables(row), **options) for row in rows]
+
+    def decimal_context(self, precision=None, rounding=None):
+        """
+        Returns a context manager of a local decimal context, which has precision and rounding of the call, or of
+        the instance. Others parameters are copied from the current context. It's thread-safe and task-safe.
+        The current context is used as is, if neither precision nor rounding is set.
+        """
+        precision = precision if precision is not None else self._precision
+        rounding = rounding if rounding is not None else self._rounding
+
+        if precision is None and rounding is None:
+            return nullcontext()
+
+        context = getcontext().copy()
+
+        try:
+            if precision is not None:
+                context.prec = precision
+            if rounding is not None:
+                context.rounding = rounding
+        except (TypeError, ValueError):
+            raise TeXCalcException.InitError.BadDecimalContext(precision=precision, rounding=rounding)
+
+        return localcontext(context)
+
+    def compile_context_map(self):
+        """
+        Validates the context map and prebuilds a callable for each of its nodes, so calls of TeXCalc instance
+        only do arithmetic. It's called on instantiation, or lazily if the context map was passed afterwards.
+        The context map is compiled once, even if computations in several threads call it at once.
+        """
+        self.__check_not_shared('compile_context_map')
+
+        with self._compile_lock:
+            if self._context_map is not None and self._compiled_context_map is self._context_map:
+                return  # compiled by a concurrent call
+
+            if self._context_map is None:
+                raise TeXCalcException.InvalidContextMap.NotDefined()
+
+            if not isinstance(self._context_map, dict):
+                raise TeXCalcException.InvalidContextMap.NotDict(wrong_type=type(self._context_map))
+
+            for k, v in self._context_map.items():
+                if not isinstance(k, int):
+                    raise TeXCalcException.InvalidContextMap.NotIntegerIndex(wrong_type=type(k))
+
+                if not isinstance(v, ContextProcessor):
+                    raise TeXCalcException.InvalidContextMap.NotContextProcessor(wrong_type=type(v))
+
+            for context_processor in self._context_map.values():
+                context_processor.compile()
+
+            order = self.__order_indices()
+            branch_counts = {}  # index: a number of branches of the node, see TeXCalc.branch_count
+
+            for index in order:  # children go first
+                context_processor = self._context_map[index]
+                children = [self._context_map[child] for child in context_processor._indices]
+
+                branch_counts[index] = 2 ** context_processor.signs
+                for child in context_processor._occurrences:
+                    branch_counts[index] *= branch_counts[child]
+
+                context_processor._is_async = context_processor._is_async or any([
+                    child._is_async for child in children
+                ])
+                used_vars = {var for child in children for var in child._used_vars}
+                if context_processor.is_variable:
+                    used_vars.add(context_processor._context)
+
+                context_processor.use_vars(used_vars)
+
+            self._order, self._branch_counts = order, branch_counts  # concurrent computations see whole ones
+            self._compiled_context_map = self._context_map
+
+    def optimize(self):
+        """
+        ... removed = func.optimize()  # or TeXCalc(..., optimize=True)
+        Folds subexpressions without variables into constants and merges equal subexpressions(a+b and b+a too).
+        Returns a number of removed nodes. Constants are computed with precision of the instance, not of calls.
+        """
+        self.__check_not_shared('optimize')
+
+        return optimizer.optimize(self)
+
+    def make_cache(self):
+        """ Creates a cache for a node of the context map by the cache policy of the instance """
+        return self._cache_class(maxsize=self._cache_maxsize, ttl=self._cache_ttl)
+
+    def cache_info(self):
+        """ Returns hits, misses, evictions and a size of caches summed over all nodes of the context map """
+        infos = [context_processor._computed.info() for context_processor in (self._context_map or {}).values()]
+
+        return CacheInfo(
+            hits=sum([info.hits for info in infos]),
+            misses=sum([info.misses for info in infos]),
+            evictions=sum([info.evictions for info in infos]),
+            currsize=sum([info.currsize for info in infos]),
+            maxsize=self._cache_maxsize
+        )
+
+    def cache_clear(self):
+        """ Clears caches and counters of all nodes of the context map """
+        self.__check_not_shared('cache_clear')
+
+        for context_processor in (self._context_map or {}).values():
+            context_processor._computed.clear()
+
+    def __check_not_shared(self, method):
+        if self._shared:
+            raise TeXCalcException.UserError.SharedInstance(method=method)
+
+    def __order_indices(self):
+        """ Returns indices of nodes needed for the main expression, so each node goes after all its children """
+        order = []
+        visited = set()
+        stack = [(0, False)]
+
+        while stack:
+            index, children_visited = stack.pop()
+
+            if children_visited:
+                order.append(index)
+                continue
+
+            if index in visited:
+                continue
+
+            visited.add(index)
+            stack.append((index, True))
+            stack.extend([(child, False) for child in self._context_map[index]._indices if child not in visited])
+
+        return tuple(order)
+
+    def to_python_source(self, backend=None, name='texcalc'):
+        """
+        ... open('roots.py', 'w').write(func.to_python_source(backend='float', name='roots'))
+        Returns source of a python module with a straight-line function of the expression by the name, where
+        variables are positional arguments in order of TeXCalc variables, see TeXCalc.codegen. The function
+        returns a tuple of distinct values of ± branches, not rounded and computed in the current decimal context.
+        Backend is one of TeXCalc.backends, the backend of the instance by default.
+        """
+        return codegen.generate(self, backend=backend, name=name)
+
+    def to_callable(self, backend=None, name='texcalc'):
+        """
+        ... roots = func.to_callable(backend='float'); roots(1, -8, 15)  # (5.0, 3.0)
+        Returns the function of TeXCalc.to_python_source, executed in a new namespace.
+        """
+        namespace = {}
+        exec(compile(self.to_python_source(backend=backend, name=name), f"<texcalc {name}>", 'exec'), namespace)
+
+        return namespace[name]
+
+    def profile(self):
+        """
+        ... with func.profile() as profiler:
+        ...     func(a=1, b=-8, c=15)
+        ... print(profiler.report()); open('nodes.folded', 'w').write(profiler.collapsed())
+        Starts and returns a profiler of nodes of the expression, see TeXCalc.profiler. It's stopped on exit from
+        the with statement or by profiler.stop(), then computations aren't slowed down by it at all.
+        """
+        self.__check_not_shared('profile')
+
+        return Profiler(self).start()
+
+    def __prepare_arrays(self, kwargs, backend):
+        """ Returns a dict of arrays of variables' values and their broadcast shape """
+        variables = {}
+        for var_name in self._vars or ():
+            if var_name not in kwargs:
+                raise TeXCalcException.UserError.NotEnoughVariables(var_name=var_name)
+
+            try:
+                variables[var_name] = backend.array(kwargs[var_name])
+            except:
+                raise TeXCalcException.UserError.NotDecimal(
+                    wrong_var_name=var_name,
+                    wrong_var=kwargs[var_name]
+                )
+
+        return variables, backend.numpy.broadcast_shapes(*[array.shape for array in variables.values()])
+
+    def __compute_on_backend(self, variables, backend):
+        """ Computes all ± branches of the expression in one pass over the context map, without caches """
+        if self._compiled_context_map is not self._context_map:
+            self.compile_context_map()
+
+        values = {}
+
+        for index in self._order:
+            context_processor = self._context_map[index]
+            values[index] = context_processor.compute_batch(
+                {i: values[i] for i in context_processor._indices},
+                variables,
+                backend
+            )
+
+        return values[0]
+
+    def evaluate_batch(self, **kwargs):
+        """
+        ... roots = func.evaluate_batch(a=numpy.array([1, -2]), b=numpy.array([-8, 10]), c=numpy.array([15, 12]))
+        Computes the expression over whole arrays of variables' values in one pass with numpy ufuncs. Returns
+        a tuple of arrays, one per each ± branch of the expression(they aren't deduplicated like in __call__).
+        """
+        backend = get_backend('numpy')
+        variables, shape = self.__prepare_arrays(kwargs, backend)
+
+        return tuple([
+            backend.numpy.broadcast_to(answer, shape).copy()
+            for answer in self.__compute_on_backend(variables, backend)
+        ])
+
+    def __compute_with_grad(self, variables, backend):
+        """
+        Seeds variables by dual numbers with unit gradients and computes the expression on them, see TeXCalc.dual.
+        Returns pairs of a value and a tuple of derivatives in order of variables, one per each ± branch.
+        """
+        names = self._vars or ()
+        one, zero = backend.number(1), backend.number(0)
+        variables = {
+            name: Dual(value, tuple([one if other == name else zero for other in names]))
+            for name, value in variables.items()
+        }
+
+        return [
+            unpack(answer, len(names), zero)
+            for answer in self.__compute_on_backend(variables, get_dual_backend(backend.name))
+        ]
+
+    def value_and_grad(self, **kwargs):
+        """
+        ... ((root, grad), (other_root, other_grad)) = func.value_and_grad(a=1, b=-8, c=15)  # grad['a'] == -25
+        Computes values of the expression with exact partial derivatives by all variables(forward mode automatic
+        differentiation on dual numbers) in one pass over the context map, instead of 2N+1 computations of finite
+        differences. Returns a pair of a value and a dict of derivatives by variables' names per each distinct
+        ± branch. Caches of nodes aren't used.
+        """
+        vars_dict, _ = self.__prepare_variables(kwargs)
+        digits = kwargs.get('round', self.DEFAULT_ROUND)
+
+        with self.decimal_context(precision=kwargs.get('precision', None), rounding=kwargs.get('rounding', None)):
+            answers = self.__compute_with_grad(vars_dict, self._backend)
+
+        backend = self._backend
+        answers = distinct([
+            (backend.round(value, digits), tuple([backend.round(derivative, digits) for derivative in grad]))
+            for value, grad in answers
+        ])
+
+        return tuple([(value, dict(zip(self._vars or (), grad))) for value, grad in answers])
+
+    def value_and_grad_batch(self, **kwargs):
+        """
+        ... ((roots, grads), ...) = func.value_and_grad_batch(a=numpy.array([1, -2]), b=..., c=...)
+        Like TeXCalc.value_and_grad, but over whole arrays of variables' values with numpy ufuncs, like
+        TeXCalc.evaluate_batch. Returns a pair of an array and a dict of arrays of derivatives per each ± branch.
+        """
+        backend = get_backend('numpy')
+        variables, shape = self.__prepare_arrays(kwargs, backend)
+
         return tuple([
-            round(answer, kwargs.get('round', self.DEFAULT_ROUND))
-            for answer in self._context_map[0].compute(**vars_dict)
+            (
+                backend.numpy.broadcast_to(value, shape).copy(),
+                {
+                    name: backend.numpy.broadcast_to(derivative, shape).copy()
+                    for name, derivative in zip(self._vars or (), grad)
+                }
+            )
+            for value, grad in self.__compute_with_grad(variables, backend)
         ])
 
     def __has_unsupported_operands(self):
@@ -154,6 +794,29 @@ class TeXCalc:
         return True
 
     def __make_context_map(self):
+        """
+        Parses the expression into the context map with Parser. Custom processors, which aren't CustomFunction
+        subclasses, define their own patterns, so the context map is made by regex rewriting for them.
+        """
+        builtin_processors = (Sqrt, Exponentiation, Logarithm, Fraction, TrigFunction, InverseTrigFunction, Constant)
+        if not all([
+            processor in builtin_processors or issubclass(processor, CustomFunction)
+            for processor in self._processors
+        ]):
+            return self.__rewrite_context_map()
+
+        contexts = Parser(
+            self.__expr,
+            variables=self._vars,
+            custom_names=[processor.name for processor in self._processors if issubclass(processor, CustomFunction)]
+        ).parse()
+
+        self._context_map = {
+            index: ContextProcessor(self, context, index, variable_names=self._vars)
+            for index, context in contexts.items()
+        }
+
+    def __rewrite_context_map(self):
         self._context_map = {}
 
         pat_context = re.compile(r"\{(?P<context>[^\{\}]+)\}")
@@ -250,7 +913,7 @@ class TeXCalc:
                 k += 1
                 index = k
 
-            self._context_map[index] = var if var != 'e' else '2.7182818284'
+            self._context_map[index] = var if var != 'e' else '\\e'
 
             for i, context in self._context_map.items():
                 if i == index:
@@ -305,8 +968,8 @@ class TeXCalc:
                 for processor in self._processors
             ])
 
-            supported_operands += \
-                f"\nAlso:\t{', '.join([operand for operand in ContextProcessor.STATIC_OPERANDS.keys()])}"
+            static_operands = [operand for operand in ContextProcessor.STATIC_OPERANDS.keys() if operand != r"\\e"]
+            supported_operands += f"\nAlso:\t{', '.join(static_operands)}"
         except:
             raise TeXCalcException.UserError.InvalidDoc()
 
@@ -0,0 +1,307 @@
+"""
+Transcendental functions of Decimal numbers, which are computed in the current decimal context, so results have
+its precision instead of ~15 digits of float. Each function works with guard digits and rounds the result to the
+context once. Arguments of sin and cos are reduced modulo π/2 to [-π/4, π/4], and arctan reduces its argument
+to |x| < 0.1, where Taylor series converge fast. exp, ln and log10 are methods of Decimal, which are already
+correctly rounded. Invalid arguments raise ValueError like functions of math.
+
+When the precision of the context is within float's one, functions are computed by math on floats, which is
+several times faster, see _float.
+"""
+import math
+import sys
+from decimal import Decimal, getcontext, localcontext
+from functools import lru_cache, wraps
+
+GUARD_DIGITS = 10
+ATAN_REDUCED = Decimal('0.1')  # arctan's argument is halved until it's less than that
+FLOAT_DIGITS = sys.float_info.dig  # the largest precision, which is computed on floats
+LN_CACHE_MAXSIZE = 256  # logarithms of bases of log
+PI_CACHE_MAXSIZE = 64  # π per precision and rounding, precision is extended by reduction of large arguments
+
+
+def _decimal(x):
+    return x if isinstance(x, Decimal) else Decimal(str(x))
+
+
+def _finite(x):
+    x = _decimal(x)
+
+    if not x.is_finite():
+        raise ValueError("math domain error")
+
+    return x
+
+
+def _float(math_function):
+    """
+    Computes the function by the math function on floats, if the precision of the context isn't more than
+    FLOAT_DIGITS, and rounds the result to the context. Like math, the result has float's absolute error, which
+    matters only for ill-conditioned arguments, like sin near multiples of π. Arguments, which are invalid or
+    overflow floats, are computed by the function itself.
+    """
+    def decorator(function):
+        @wraps(function)
+        def apply(*args):
+            if getcontext().prec <= FLOAT_DIGITS:
+                try:
+                    value = math_function(*[float(arg) for arg in args])
+                except (OverflowError, ValueError):
+                    value = math.nan
+
+                if math.isfinite(value):
+                    return +Decimal(value)
+
+            return function(*args)
+
+        return apply
+
+    return decorator
+
+
+def pi():
+    """ Returns π in the current context, it's computed once per precision and rounding """
+    return _pi(getcontext().prec, getcontext().rounding)
+
+
+@lru_cache(maxsize=PI_CACHE_MAXSIZE)
+def _pi(precision, rounding):
+    with localcontext() as context:
+        context.prec = precision + GUARD_DIGITS
+        lasts, t, s, n, na, d, da = 0, Decimal(3), Decimal(3), 1, 0, 0, 24
+
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+
+    with localcontext() as context:
+        context.prec, context.rounding = precision, rounding
+        return +s
+
+
+def e():
+    """ Returns Euler's number in the current context """
+    return Decimal(1).exp()
+
+
+def phi():
+    """ Returns the golden ratio in the current context """
+    return _apply(lambda: (1 + Decimal(5).sqrt()) / 2)
+
+
+def _sin_series(x):
+    """ Taylor series of sin, for |x| <= π/4 """
+    x2 = -x * x
+    term, total, n = x, x, 1
+
+    while True:
+        n += 2
+        term = term * x2 / (n * (n - 1))
+        result = total + term
+
+        if result == total:
+            return total
+
+        total = result
+
+
+def _cos_series(x):
+    """ Taylor series of cos, for |x| <= π/4 """
+    x2 = -x * x
+    term, total, n = Decimal(1), Decimal(1), 0
+
+    while True:
+        n += 2
+        term = term * x2 / (n * (n - 1))
+        result = total + term
+
+        if result == total:
+            return total
+
+        total = result
+
+
+def _reduce(x):
+    """
+    Returns y in [-π/4, π/4] and a number of quarters of π, where x = y + quarters * π/2 modulo 2π. Digits of
+    the integer part of x are lost on reduction, so they're added to the current(extended) context.
+    """
+    half_pi = pi() / 2
+
+    if abs(x) <= half_pi / 2:
+        return x, 0
+
+    getcontext().prec += max(0, x.adjusted())
+    half_pi = pi() / 2
+
+    x -= (x / (4 * half_pi)).to_integral_value() * 4 * half_pi
+    quarter = int((x / half_pi).to_integral_value())
+
+    return x - quarter * half_pi, quarter % 4
+
+
+def _sin(x, quarters=0):
+    """ Returns sin(x + quarters * π/2) in the current(extended) context, computing a single series """
+    y, quarter = _reduce(x)
+    quarter = (quarter + quarters) % 4
+    value = _sin_series(y) if quarter % 2 == 0 else _cos_series(y)
+
+    return value if quarter < 2 else -value
+
+
+def _tan(x):
+    y, quarter = _reduce(x)
+    sin, cos = _sin_series(y), _cos_series(y)
+
+    return sin / cos if quarter % 2 == 0 else -cos / sin
+
+
+def _apply(function, *args):
+    """ Computes the function with guard digits and rounds its result to the current context """
+    with localcontext() as context:
+        context.prec += GUARD_DIGITS
+        result = function(*args)
+
+    return +result
+
+
+@_float(math.sin)
+def sin(x):
+    return _apply(_sin, _finite(x))
+
+
+@_float(math.cos)
+def cos(x):
+    return _apply(_sin, _finite(x), 1)
+
+
+@_float(math.tan)
+def tan(x):
+    return _apply(_tan, _finite(x))
+
+
+def _atan(x):
+    """ Returns arctan of x in the current(extended) context """
+    if x < 0:
+        return -_atan(-x)
+
+    if x > 1:
+        return pi() / 2 - _atan(1 / x)
+
+    halvings = 0
+    while x > ATAN_REDUCED:
+        x = x / (1 + (1 + x * x).sqrt())  # tan(a / 2) by tan(a)
+        halvings += 1
+
+    x2 = -x * x
+    power, total, n = x, x, 1
+
+    while True:
+        n += 2
+        power *= x2
+        result = total + power / n
+
+        if result == total:
+            return total * 2 ** halvings
+
+        total = result
+
+
+@_float(math.atan)
+def atan(x):
+    return _apply(_atan, _finite(x))
+
+
+def _asin(x):
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+
+    if abs(x) == 1:
+        return pi() / 2 * x
+
+    return _atan(x / (1 - x * x).sqrt())
+
+
+@_float(math.asin)
+def asin(x):
+    return _apply(_asin, _finite(x))
+
+
+@_float(math.acos)
+def acos(x):
+    return _apply(lambda x: pi() / 2 - _asin(x), _finite(x))
+
+
+@_float(math.exp)
+def exp(x):
+    return _decimal(x).exp()
+
+
+@_float(math.log)
+def ln(x):
+    x = _decimal(x)
+
+    if x <= 0:
+        raise ValueError("math domain error")
+
+    return x.ln()
+
+
+@_float(math.log10)
+def log10(x):
+    x = _decimal(x)
+
+    if x <= 0:
+        raise ValueError("math domain error")
+
+    return x.log10()
+
+
+@lru_cache(maxsize=LN_CACHE_MAXSIZE)
+def _ln(x, precision, rounding):
+    """ Bases of log are mostly constants, so their logarithms are cached per precision and rounding """
+    with localcontext() as context:
+        context.prec, context.rounding = precision, rounding
+        return ln(x)
+
+
+def _log(x, base):
+    return ln(x) / _ln(base, getcontext().prec, getcontext().rounding)
+
+
+@_float(math.log)
+def log(x, base):
+    return _apply(_log, _decimal(x), _decimal(base))
+
+
+def _small(function):
+    """ Adds digits, which are lost on subtraction of exponents of a small argument """
+    def apply(x):
+        if x:
+            getcontext().prec += max(0, -x.adjusted())
+
+        return function(x)
+
+    return apply
+
+
+@_float(math.sinh)
+def sinh(x):
+    return _apply(_small(lambda x: (x.exp() - (-x).exp()) / 2), _finite(x))
+
+
+@_float(math.cosh)
+def cosh(x):
+    return _apply(lambda x: (x.exp() + (-x).exp()) / 2, _finite(x))
+
+
+@_float(math.tanh)
+def tanh(x):
+    def function(x):
+        exp = (2 * x).exp()
+        return (exp - 1) / (exp + 1)
+
+    return _apply(_small(function), _finite(x))
@@ -1,4 +1,11 @@
-DEFAULT_DECIMAL_PRECISION = 10
+DEFAULT_BACKEND = 'decimal'
+DEFAULT_CACHE_POLICY = 'lru'
+DEFAULT_CACHE_MAXSIZE = 1024  # per each node of a context map
+DEFAULT_MAP_CHUNKSIZE = 256  # rows per task of TeXCalc.map
+DEFAULT_SWEEP_CHUNKSIZE = 4096  # rows per task of TeXCalc.sweep
+DEFAULT_STREAM_CONCURRENCY = 64  # rows computed at once by TeXCalc.astream
+COMPILED_CACHE_MAXSIZE = 512  # of TeXCalc.compile
+FIBONACCI_CACHE_MAXSIZE = 256  # pairs of fibonacci numbers shared by all FibonacciFunction processors
 reserved_words = (
     "lg",
     "ln",
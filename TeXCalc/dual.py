@@ -0,0 +1,212 @@
+"""
+Forward mode automatic differentiation. A variable is a dual number: its value and a tuple of partial derivatives
+by all variables of an expression, where its own derivative is 1. Operations and functions of DualBackend carry
+derivatives along with values, so a single pass over a context map gives both the value of the expression and its
+gradient. Numbers without derivatives(constants and subtrees without variables) stay numbers of the base backend,
+so they're computed as usual.
+"""
+from .backends import Backend, get_backend
+from .exceptions import TeXCalcException
+
+
+class Dual:
+    """ A number of a base backend with partial derivatives by variables """
+    __slots__ = ('value', 'grad')
+    __array_ufunc__ = None  # numpy defers operations with dual numbers to their reflected methods
+
+    def __init__(self, value, grad):
+        self.value = value
+        self.grad = grad
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.grad!r})"
+
+    def __pos__(self):
+        return Dual(+self.value, self.grad)
+
+    def __neg__(self):
+        return Dual(-self.value, tuple([-g for g in self.grad]))
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, tuple([a + b for a, b in zip(self.grad, other.grad)]))
+
+        return Dual(self.value + other, self.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, tuple([a - b for a, b in zip(self.grad, other.grad)]))
+
+        return Dual(self.value - other, self.grad)
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, tuple([-g for g in self.grad]))
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(
+                self.value * other.value,
+                tuple([a * other.value + self.value * b for a, b in zip(self.grad, other.grad)])
+            )
+
+        return Dual(self.value * other, tuple([g * other for g in self.grad]))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            value = self.value / other.value
+            return Dual(value, tuple([(a - value * b) / other.value for a, b in zip(self.grad, other.grad)]))
+
+        return Dual(self.value / other, tuple([g / other for g in self.grad]))
+
+    def __rtruediv__(self, other):
+        value = other / self.value
+        return Dual(value, tuple([-value * g / self.value for g in self.grad]))
+
+
+def unpack(number, size, zero):
+    """ Returns the value and the gradient of a dual number, or of a number of a base backend(its gradient is 0) """
+    if isinstance(number, Dual):
+        return number.value, number.grad
+
+    return number, (zero,) * size
+
+
+def _scale(grad, derivative):
+    return tuple([derivative * g for g in grad])
+
+
+def _unary(function, derivative):
+    """ Makes a function of dual numbers from a function of the base backend and its derivative """
+    def apply(x, *args):
+        if not isinstance(x, Dual):
+            return function(x, *args)
+
+        return Dual(function(x.value, *args), _scale(x.grad, derivative(x.value)))
+
+    return apply
+
+
+def _binary(function, left_derivative, right_derivative):
+    """ Derivatives are functions of both arguments and the value of the function """
+    def apply(x, y):
+        if not isinstance(x, Dual) and not isinstance(y, Dual):
+            return function(x, y)
+
+        x_value = x.value if isinstance(x, Dual) else x
+        y_value = y.value if isinstance(y, Dual) else y
+        value = function(x_value, y_value)
+        grad = None
+
+        if isinstance(x, Dual):
+            grad = _scale(x.grad, left_derivative(x_value, y_value, value))
+
+        if isinstance(y, Dual):
+            y_grad = _scale(y.grad, right_derivative(x_value, y_value, value))
+            grad = y_grad if grad is None else tuple([a + b for a, b in zip(grad, y_grad)])
+
+        return Dual(value, grad)
+
+    return apply
+
+
+class DualBackend(Backend):
+    """
+    Computes on dual numbers over numbers of a base backend, see TeXCalc.value_and_grad. Functions of processors
+    are differentiated analytically with functions of the base backend.
+    """
+
+    def __init__(self, backend):
+        super(DualBackend, self).__init__()
+
+        self.backend = backend
+        self.name = f"dual-{backend.name}"
+
+        f = backend.functions
+        one, two, ten = backend.number(1), backend.number(2), backend.number(10)
+
+        def power_derivative(x, exponent, value):
+            """ x^0 is 1 at x = 0 too, while 0^0 is an invalid operation of Decimal """
+            if not hasattr(exponent, 'shape') and exponent == one:
+                return exponent
+
+            return exponent * f['power'](x, exponent - one)
+
+        def sqrt(x):
+            return f['root'](x, two)
+
+        self.functions = {
+            'sin': _unary(f['sin'], f['cos']),
+            'cos': _unary(f['cos'], lambda x: -f['sin'](x)),
+            'tan': _unary(f['tan'], lambda x: one / (f['cos'](x) * f['cos'](x))),
+            'cot': _unary(f['cot'], lambda x: -one / (f['sin'](x) * f['sin'](x))),
+            'sec': _unary(f['sec'], lambda x: f['sin'](x) / (f['cos'](x) * f['cos'](x))),
+            'csc': _unary(f['csc'], lambda x: -f['cos'](x) / (f['sin'](x) * f['sin'](x))),
+            'sinh': _unary(f['sinh'], f['cosh']),
+            'cosh': _unary(f['cosh'], f['sinh']),
+            'tanh': _unary(f['tanh'], lambda x: one / (f['cosh'](x) * f['cosh'](x))),
+            'coth': _unary(f['coth'], lambda x: -one / (f['sinh'](x) * f['sinh'](x))),
+            'arcsin': _unary(f['arcsin'], lambda x: one / sqrt(one - x * x)),
+            'arccos': _unary(f['arccos'], lambda x: -one / sqrt(one - x * x)),
+            'arctan': _unary(f['arctan'], lambda x: one / (one + x * x)),
+            'arccot': _unary(f['arccot'], lambda x: -one / (one + x * x)),
+            'arcsec': _unary(f['arcsec'], lambda x: one / (abs(x) * sqrt(x * x - one))),
+            'arccsc': _unary(f['arccsc'], lambda x: -one / (abs(x) * sqrt(x * x - one))),
+            'lg': _unary(f['lg'], lambda x: one / (x * f['ln'](ten, None))),  # in the current decimal context
+            'ln': _unary(f['ln'], lambda x: one / x),
+            'log': _binary(
+                f['log'],
+                lambda x, base, value: one / (x * f['ln'](base, None)),
+                lambda x, base, value: -value / (base * f['ln'](base, None))
+            ),
+            'power': _binary(
+                f['power'],
+                power_derivative,
+                lambda x, exponent, value: value * f['ln'](x, None)
+            ),
+            'root': _binary(
+                f['root'],
+                lambda x, exponent, value: value / (exponent * x),
+                lambda x, exponent, value: -value * f['ln'](x, None) / (exponent * exponent)
+            ),
+        }
+
+    def number(self, value):
+        return self.backend.number(value)
+
+    def elementwise(self, function):
+        """ Functions of python scalars(like ones of custom processors) can't be differentiated """
+        function = self.backend.elementwise(function)
+
+        def apply(*values):
+            if any([isinstance(value, Dual) for value in values]):
+                raise TeXCalcException.ComputeError.NotDifferentiable()
+
+            return self.backend.number(function(*values))
+
+        return apply
+
+    def batchwise(self, function):
+        function = self.backend.batchwise(function)
+
+        def apply(value):
+            if isinstance(value, Dual):
+                raise TeXCalcException.ComputeError.NotDifferentiable()
+
+            return self.backend.number(function(value))
+
+        return apply
+
+
+_instances = {}
+
+
+def get_dual_backend(name):
+    """ Returns a shared instance of DualBackend over the backend by its name """
+    if name not in _instances:
+        _instances[name] = DualBackend(get_backend(name))
+
+    return _instances[name]
@@ -52,6 +52,12 @@ class TeXCalcException:
                                    "You can check which LaTeX operands the TeXCalc supports, "
                                    "see TeXCalc_instance.SUPPORTED_OPERANDS. Notice: You should pass custom "
                                    "functions without \\ before function name(like it is in original LaTeX).",
+            'BadExpression': "Can't parse the expression: {reason}.",
+            'BadCachePolicy': "Cache policy {policy} isn't supported. Pass one of {supported}, a subclass of "
+                              "TeXCalc.cache.Cache or None to disable caching. 'ttl' policy requires cache_ttl.",
+            'BadDecimalContext': "Decimal precision must be a positive integer and rounding must be one of "
+                                 "rounding modes of decimal module, not precision={precision}, "
+                                 "rounding={rounding}.",
         }
 
     class ComputeError(BaseException, metaclass=TeXCalcError):
@@ -59,10 +65,23 @@ class TeXCalcException:
             'NotComputableField': "Cannot compute {field} on {processor_cls}: {processor} with index {index}. "
                                   "There is a context or unaddressable index.",
             'NotComputableProcessor': "Cannot compute result on {processor_cls}: {processor} with index {index}.",
+            'NotComputableContext': "Cannot compute context {context} with index {index}. There are unsupported "
+                                    "symbols or it isn't a valid arithmetic expression.",
             'IncorrectLogarithm': "Logarithm functions must be without a base, except 'log'.",
             'InvalidFibonacciPosition': "Fibonacci function has received invalid position parameter={parameter}."
                                         "Only greater than 0 positions are supports.",
-            'SqrtOfNegativeValue': "Can't get root with even exponent({exponent}) of negative value({value})."
+            'SqrtOfNegativeValue': "Can't get root with even exponent({exponent}) of negative value({value}).",
+            'AsyncProcessor': "{processor_cls} with index {index} computes asynchronously. Use "
+                              "await TeXCalc_instance.acompute(...) to compute the expression.",
+            'NotGeneratable': "Can't generate python source of context {context} with index {index}: {reason}.",
+            'NotDifferentiable': "Processors on functions of python scalars(like custom functions) are computed "
+                                 "element by element, so they can't be differentiated by variables."
+        }
+
+    class BackendError(BaseException, metaclass=TeXCalcError):
+        errors = {
+            'NotInstalled': "Backend '{backend}' requires the '{package}' package. Please install it.",
+            'NotSupported': "Backend '{backend}' isn't supported. Supported backends: {supported}."
         }
 
     class CustomFunctionError(BaseException, metaclass=TeXCalcError):
@@ -86,12 +105,29 @@ class TeXCalcException:
             'NotDefined': "Context map doesn't defined. You must define the context_map before computing a result"
         }
 
+    class SerializationError(BaseException, metaclass=TeXCalcError):
+        errors = {
+            'UnsupportedFormat': "Can't load a compiled expression of format {format} version {version}. "
+                                 "Supported format is {supported_format} version {supported_version}.",
+            'UnknownProcessor': "Can't find processor {processor} of a compiled expression. Pass its class to "
+                                "custom_processors when you're loading the expression.",
+            'NoVariables': "Can't find variables for formula {path}. Add a line '% variables: a, b' to the file "
+                           "or pass variables explicitly."
+        }
+
     class UserError(BaseException, metaclass=TeXCalcError):
         errors = {
             'NotDecimal': "You can pass only decimals as keyword parameters when calling TeXCalc instance, "
                           "not {wrong_var_name}={wrong_var}",
             'NotEnoughVariables': "You must pass all variables as keyword arguments that you've passed to "
                                   "TeXCalc constructor as 'variables' kwarg. {var_name} doesn't found.",
+            'BadFunctionName': "A generated function {name} and its arguments {variables} must be python "
+                               "identifiers.",
+            'BadSortKey': "Profiler's report can be sorted only by one of {supported}, not by {sort}.",
+            'BadBranch': "Branch {branch} doesn't exist. Branches of the expression are numbered from 0 to "
+                         "TeXCalc_instance.branch_count - 1, there are {count} of them.",
+            'SharedInstance': "Can't call {method} of an instance of TeXCalc.compile, which is shared by all its "
+                              "callers. Create your own instance by TeXCalc(...) to modify it.",
             'InvalidDoc': "You should define a Doc class on your CustomProcessor with string attributes: "
                           "verbose_name, example, description. For normally show help about supported operands."
         }
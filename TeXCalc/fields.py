@@ -2,53 +2,94 @@ import re
 from decimal import *
 
 from .exceptions import TeXCalcException
-from .defines import DEFAULT_DECIMAL_PRECISION
 
 
 class Field:
+    """
+    Descriptor for parsed parts of a processor. A value is stored on the processor instance itself, in a slot
+    named by Field.storage_name, so it's freed together with the instance.
+    """
     _type = str
 
     def __init__(self, *args, context=False, indexed=False, choices=None, default=None, **kwargs):
-        self.__value = {}
+        self._storage = None
         self._may_context = context
         self._may_indexed = indexed
         self._choices = choices
         self._default = default
 
+    @staticmethod
+    def storage_name(name):
+        return f"_field_{name}"
+
+    def __set_name__(self, owner, name):
+        self._storage = self.storage_name(name)
+
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
         try:
-            return self.__value[instance._id]
-        except KeyError:
+            return getattr(instance, self._storage)
+        except AttributeError:
             return None
 
     def __set__(self, instance, value):
-        self.__value[instance._id] = {'value': self._default, 'context': False, 'index': False}
+        field = {'value': self._default, 'context': False, 'index': False, 'choice': None}
+        setattr(instance, self._storage, field)
 
         if value is None:
             return
 
         try:
-            self.__value[instance._id]['value'] = self._type(value)
+            field['value'] = self._type(value)
         except:
             if (
                     self._may_context and not
             (re.fullmatch(r'/\d+/', str(value)) or re.fullmatch(r'@/\d+/@', str(value)))
             ):
-                self.__value[instance._id]['value'] = str(value)
-                self.__value[instance._id]['context'] = True
+                field['value'] = str(value)
+                field['context'] = True
             elif self._may_indexed and value.replace('/', '').replace('@', '').isdigit():
-                self.__value[instance._id]['value'] = int(value.replace('/', '').replace('@', ''))
-                self.__value[instance._id]['index'] = True
+                field['value'] = int(value.replace('/', '').replace('@', ''))
+                field['index'] = True
             else:
                 raise TeXCalcException.FieldError.BadFieldArgument(value=value)
 
         if self._choices:
+            field['choice'] = field['value']
+
             try:
-                self.__value[instance._id]['value'] = self._choices[
-                    self.__value[instance._id]['value']
-                ]
+                field['value'] = self._choices[field['value']]
             except KeyError:
-                raise TeXCalcException.FieldError.BadChoicesMap(value=self.__value[instance._id]['value'])
+                raise TeXCalcException.FieldError.BadChoicesMap(value=field['value'])
+
+    def dump_value(self, field):
+        """ Returns a json-compatible dict of the field, see Field.load_value """
+        if field is None:
+            return None
+
+        value = field['value']
+        if field['choice'] is not None:
+            value = None
+        elif value is not None and not isinstance(value, (int, str)):
+            value = str(value)
+
+        return {**field, 'value': value}
+
+    def load_value(self, instance, dumped):
+        """ Restores the field dumped by Field.dump_value on the instance without parsing """
+        if dumped is None:
+            return
+
+        field = dict(dumped)
+
+        if field['choice'] is not None:
+            field['value'] = self._choices[field['choice']]
+        elif field['value'] is not None and not field['index'] and not field['context']:
+            field['value'] = self._type(field['value'])
+
+        setattr(instance, self._storage, field)
 
 
 class IntegerField(Field):
@@ -61,11 +102,3 @@ class FloatField(Field):
 
 class DecimalField(Field):
     _type = Decimal
-
-    def __init__(self, *args, precision=DEFAULT_DECIMAL_PRECISION, **kwargs):
-        self.precision = precision
-        super(DecimalField, self).__init__(*args, **kwargs)
-
-    def __call__(self, value, index=False):
-        getcontext().prec = self.precision
-        return super(DecimalField, self).__call__(value, index=index)
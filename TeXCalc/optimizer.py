@@ -0,0 +1,69 @@
+from .exceptions import TeXCalcException
+
+
+def optimize(texcalc_instance):
+    """
+    Optimizes the context map of the TeXCalc instance and returns a number of removed nodes:
+        - nodes without variables are computed once(in the decimal context of the instance), and their values
+          are inlined into arithmetic and operands of processors of their parents, like \\frac{1}{4} or 2^{10};
+        - structurally equal nodes are merged, considering commutativity of + and *, like a+b and b+a.
+    Nodes are visited in order of TeXCalc._order, so children are already optimized, when a parent is visited.
+    """
+    func = texcalc_instance
+
+    if func._compiled_context_map is not func._context_map:
+        func.compile_context_map()
+
+    context_map = func._context_map
+    size = len(context_map)
+    key = (None,) * (len(func._vars or ()) + 1)  # the key of a computation without variables
+
+    links = {}  # index: an index of an equal node, or a constant value of the node
+    signatures = {}  # signature: index
+
+    with func.decimal_context():
+        for index in func._order:
+            context_processor = context_map[index]
+            context_processor.relink({i: links[i] for i in context_processor._indices if i in links})
+
+            if (
+                index != 0
+                and not context_processor._used_vars
+                and not context_processor._is_async
+                and not context_processor.is_variable
+            ):
+                try:
+                    values = context_processor._evaluate({}, key)
+                except (TeXCalcException.ComputeError, Exception):
+                    values = ()  # it'll fail on computations as before
+
+                if len(values) == 1:
+                    links[index] = values[0]
+                    continue
+
+            signature = context_processor.signature()
+
+            if signature in signatures:
+                links[index] = signatures[signature]
+            else:
+                signatures[signature] = index
+
+    reachable = set()
+    stack = [0]
+
+    while stack:
+        index = stack.pop()
+
+        if index not in reachable:
+            reachable.add(index)
+            stack.extend(context_map[index]._indices)
+
+    func._context_map = {
+        index: context_processor
+        for index, context_processor in context_map.items()
+        if index in reachable
+    }
+    func.compile_context_map()
+    func.cache_clear()
+
+    return size - len(func._context_map)
@@ -0,0 +1,55 @@
+"""
+A worker of a process pool gets the compiled expression once, by the initializer of the pool, and keeps it in
+_worker_function. Tasks carry only chunks of rows, so the expression is neither pickled nor parsed per task.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+_worker_function = None
+
+
+def _initialize(texcalc_instance):
+    global _worker_function
+    _worker_function = texcalc_instance
+
+
+def _compute_chunk(rows, options):
+    return _worker_function._compute_rows(rows, options)
+
+
+def chunks_of(rows, chunksize):
+    """ Yields lists of chunksize rows, so rows may be a generator of any length """
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunksize))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def sweep(texcalc_instance, rows, processes=None, chunksize=None, **kwargs):
+    """
+    Yields results of the TeXCalc instance for each row in order of rows, computing chunks of rows by a pool of
+    processes. At most two chunks per process are pending, so rows are read lazily and memory stays bounded.
+    """
+    processes = processes or os.cpu_count() or 1
+    pending = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_initialize,
+        initargs=(texcalc_instance,)
+    ) as executor:
+        for chunk in chunks_of(rows, chunksize):
+            pending.append(executor.submit(_compute_chunk, chunk, kwargs))
+
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
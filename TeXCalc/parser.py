@@ -0,0 +1,149 @@
+import re
+
+from .exceptions import TeXCalcException
+
+
+class Parser:
+    """
+    Single pass tokenizer and recursive descent parser of TeX expressions. It makes the same context map as the
+    regex rewriting of TeXCalc did: each context is a string, where operands are replaced by @/<index>/@ links
+    to other contexts, and equal contexts share the same index. But each token is visited only once, so parsing
+    takes linear time of expression's length.
+
+    ... contexts = Parser("\\frac{1}{4}(3\\sin{a} - \\sin{3a})", variables=('a',)).parse()
+    """
+
+    STATIC_OPERANDS = ('pm', 'mp', 'Phi', 'pi', 'Omega')
+    FUNCTIONS = (
+        'sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'sinh', 'cosh', 'tanh', 'coth',
+        'arcsin', 'arccos', 'arctan', 'arccot', 'arcsec', 'arccsc', 'lg', 'ln',
+    )
+    CLOSING = {'{': '}', '(': ')', '[': ']'}
+
+    def __init__(self, expression, variables=None, custom_names=()):
+        self._expression = expression
+        self._vars = variables or ()
+
+        custom = "|".join([re.escape(name) for name in sorted(custom_names, key=len, reverse=True)])
+        self._pat_token = re.compile(
+            (rf"(?P<custom>{custom})|" if custom else "") +
+            r"(?P<space>\s+)|\\(?P<command>[a-zA-Z]+)|(?P<number>\d+\.?\d*|\.\d+)|(?P<letter>[a-zA-Z])|(?P<symbol>.)"
+        )
+
+        self._tokens = []
+        self._position = 0
+        self._indices = {}  # context: index
+
+    def __tokenize(self):
+        for matched in self._pat_token.finditer(self._expression):
+            kind = matched.lastgroup
+
+            if kind != 'space':
+                self._tokens.append((kind, matched.group(kind)))
+
+    def __peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def __next(self):
+        token = self.__peek()
+        self._position += 1
+        return token
+
+    def __link(self, context):
+        """ Returns a link to the context, so it becomes a node of the context map """
+        if context not in self._indices:
+            self._indices[context] = len(self._indices) + 1  # index 0 is reserved for the main expression
+
+        return f"@/{self._indices[context]}/@"
+
+    def __sequence(self, closing=None):
+        """ Parses operands and operators up to the closing bracket. A single operand is returned as is """
+        items = []  # strings of operators or raw symbols, and tuples of operands' contexts
+
+        while True:
+            kind, value = self.__peek()
+
+            if kind is None:
+                if closing is not None:
+                    raise TeXCalcException.InitError.BadExpression(reason=f"'{closing}' is expected at the end")
+                break
+
+            if kind == 'symbol' and value == closing:
+                self.__next()
+                break
+
+            if kind == 'symbol' and value not in self.CLOSING:
+                self.__next()
+                items.append(value)
+            elif kind == 'command' and value in self.STATIC_OPERANDS:
+                self.__next()
+                items.append(f"\\{value}")
+            else:
+                items.append((self.__primary(),))
+
+        if len(items) == 1 and isinstance(items[0], tuple):
+            return items[0][0]
+
+        return "".join([self.__link(item[0]) if isinstance(item, tuple) else item for item in items])
+
+    def __argument(self, postfix=True):
+        """ Parses an argument of a function: a group in brackets, or a single operand like in \\sin x or x^2 """
+        kind, value = self.__peek()
+
+        if kind == 'symbol' and value in ('{', '('):
+            self.__next()
+            return self.__sequence(self.CLOSING[value])
+
+        if kind is None or kind == 'symbol':
+            raise TeXCalcException.InitError.BadExpression(reason=f"an argument is expected instead of '{value}'")
+
+        return self.__primary(postfix=postfix)
+
+    def __primary(self, postfix=True):
+        kind, value = self.__next()
+
+        if kind == 'number':
+            context = value
+        elif kind == 'letter':
+            context = '\\e' if value == 'e' and value in self._vars else value
+        elif kind == 'custom':
+            context = f"{value}{self.__link(self.__argument())}"
+        elif kind == 'symbol':  # only opening brackets are here
+            context = self.__sequence(self.CLOSING[value])
+        elif value in self.STATIC_OPERANDS:
+            context = f"\\{value}"
+        elif value == 'frac':
+            context = f"\\frac{self.__link(self.__argument())}{self.__link(self.__argument())}"
+        elif value == 'sqrt':
+            exponent = ""
+            if self.__peek() == ('symbol', '['):
+                self.__next()
+                exponent = f"[{self.__link(self.__sequence(']'))}]"
+
+            context = f"\\sqrt{exponent}{self.__link(self.__argument())}"
+        elif value == 'log':
+            if self.__next() != ('symbol', '_'):
+                raise TeXCalcException.ComputeError.IncorrectLogarithm()
+
+            base = self.__link(self.__argument())
+            context = f"\\log_{base}{self.__link(self.__argument())}"
+        elif value in self.FUNCTIONS:
+            context = f"\\{value}{self.__link(self.__argument())}"
+        else:
+            raise TeXCalcException.InitError.UnsupportedOperands(unsupported_operands=[value])
+
+        while postfix and self.__peek() == ('symbol', '^'):
+            self.__next()
+            context = f"{self.__link(context)}^{self.__link(self.__argument(postfix=False))}"
+
+        return context
+
+    def parse(self):
+        """ Returns a dict of contexts by their indices, where 0 is an index of the main expression """
+        self.__tokenize()
+        main_context = self.__sequence()
+
+        contexts = {index: context for context, index in self._indices.items()}
+        contexts[0] = main_context
+
+        return contexts
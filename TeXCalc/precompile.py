@@ -0,0 +1,56 @@
+"""
+Precompiles a directory of .tex formulas to .texc files, which are loaded by TeXCalc.load without parsing:
+
+    python -m TeXCalc.precompile formulas/ --variables a,b,c --processor TeXCalc.processors:FibonacciFunction
+
+Variables of a formula may also be defined in the formula file by a line: % variables: a, b, c
+It takes precedence over --variables, which are variables of formulas without such a line.
+"""
+import argparse
+import importlib
+
+from .core import TeXCalc
+from .serialization import precompile_directory
+
+
+def import_processor(name):
+    module_name, class_name = name.split(':')
+    processor_class = importlib.import_module(module_name)
+
+    for attr in class_name.split('.'):
+        processor_class = getattr(processor_class, attr)
+
+    return processor_class
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m TeXCalc.precompile', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('source', help="directory with .tex formulas")
+    parser.add_argument('-o', '--output', default=None, help="directory for .texc files, source by default")
+    parser.add_argument(
+        '--variables',
+        default=None,
+        help="comma separated variables of formulas, which don't define them"
+    )
+    parser.add_argument(
+        '--processor',
+        action='append',
+        default=[],
+        help="custom processor as module:ClassName, may be repeated"
+    )
+    args = parser.parse_args(args)
+
+    written = precompile_directory(
+        TeXCalc,
+        args.source,
+        destination=args.output,
+        variables=tuple([v.strip() for v in args.variables.split(',')]) if args.variables else None,
+        custom_processors=tuple([import_processor(name) for name in args.processor])
+    )
+
+    for path in written:
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
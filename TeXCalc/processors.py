@@ -1,9 +1,16 @@
+import asyncio
+import inspect
+import json
 import logging
-import math
 import re
 from itertools import count, product
+from operator import itemgetter
 from decimal import Decimal
 
+from . import arithmetic, decimal_math
+from .backends import decimal_backend
+from .cache import Cache, LRUCache, NoCache
+from .defines import FIBONACCI_CACHE_MAXSIZE
 from .exceptions import TeXCalcException
 from .fields import Field, DecimalField
 
@@ -11,6 +18,14 @@ from .fields import Field, DecimalField
 logger = logging.getLogger(__name__)
 
 
+def distinct(values):
+    """
+    Returns a tuple of distinct values of a node in order of its branches(combinations of ± signs), so the first
+    value is computed with all first signs. A single value isn't hashed.
+    """
+    return tuple(values) if len(values) < 2 else tuple(dict.fromkeys(values))
+
+
 class ProcessorMetaclass(type):
     @staticmethod
     def _get_needed_attr(key, attrs, bases):
@@ -32,6 +47,21 @@ class ProcessorMetaclass(type):
         instances = mcs._get_needed_attr("_subclasses", attrs, bases)
         register = mcs._get_needed_attr("_register", attrs, bases)
 
+        if '__slots__' not in attrs:
+            attrs['__slots__'] = tuple([
+                Field.storage_name(attr)
+                for attr, value in attrs.items()
+                if isinstance(value, Field)
+                and not any([hasattr(base, Field.storage_name(attr)) for base in bases])
+            ])
+
+            instance_dict = attrs.get('instance_dict', None)
+            if instance_dict is None:  # processors of TeXCalc store only fields, others may have own attributes
+                instance_dict = not attrs.get('__module__', '').startswith(f"{__package__}.")
+
+            if instance_dict and not any([base.__dictoffset__ for base in bases]):
+                attrs['__slots__'] += ('__dict__',)
+
         if pattern:
             if customized:
                 if not custom_name:
@@ -53,10 +83,13 @@ class ProcessorMetaclass(type):
 
 
 class Processor(metaclass=ProcessorMetaclass):
+    __slots__ = ('_id', 'borders', 'matched', 'context', '__weakref__')
+
     _id_counter = count(0)
     _subclasses = set()
     _custom = False
     _register = False
+    instance_dict = None  # see CustomFunction
 
     def __init__(self, *args, **kwargs):
         self._id = next(self._id_counter)
@@ -144,7 +177,7 @@ class Processor(metaclass=ProcessorMetaclass):
     @classmethod
     def validate(cls, not_context=None, index_exist=None):
         def wrapper(func):
-            def function(self, indices, **kwargs):
+            def check(self, indices, **kwargs):
                 if not_context:
                     for attr in not_context:
                         if getattr(self, attr)['context']:
@@ -166,35 +199,173 @@ class Processor(metaclass=ProcessorMetaclass):
                                 processor=str(self)
                             )
 
-                return func(self, indices, **kwargs)
+            if inspect.iscoroutinefunction(func):
+                async def function(self, indices, **kwargs):
+                    check(self, indices, **kwargs)
+                    return await func(self, indices, **kwargs)
+            else:
+                def function(self, indices, **kwargs):
+                    check(self, indices, **kwargs)
+                    return func(self, indices, **kwargs)
 
             return function
 
         return wrapper
 
     def compute(self, indices, **kwargs):
-        """ Calculates own value based on variables' values in kwargs and a piece of context map(indices) """
+        """
+        Calculates own value based on variables' values in kwargs and a piece of context map(indices).
+        It may be a coroutine function(async def compute), then the expression is computed by TeXCalc.acompute.
+        """
         pass
 
+    @property
+    def is_async(self):
+        return inspect.iscoroutinefunction(self.compute)
+
+    def dump(self):
+        """ Returns parsed fields as a json-compatible dict, see Processor.load """
+        return {
+            field_name: field.dump_value(getattr(self, field_name))
+            for field_name, field in self.__fields().items()
+        }
+
+    @classmethod
+    def load(cls, fields, **kwargs):
+        """ Creates a processor from fields dumped by Processor.dump, without matching of its pattern """
+        processor = cls(**kwargs)
+
+        for field_name, field in cls.__fields().items():
+            field.load_value(processor, fields.get(field_name, None))
+
+        return processor
+
+    def relink(self, links):
+        """
+        Replaces indices in fields by links, where a link is an index of another context, or a constant value, which
+        is inlined into an operand. Returns indices, which fields refer to after that. See TeXCalc.optimize.
+        """
+        indices = set()
+
+        for field_name in self.__fields().keys():
+            field = getattr(self, field_name)
+            if field is None or not field['index']:
+                continue
+
+            link = links.get(field['value'], field['value'])
+
+            if not isinstance(link, int) and field_name in self.operands:
+                field['value'], field['index'] = link, False
+                continue
+
+            if isinstance(link, int):
+                field['value'] = link
+
+            indices.add(field['value'])
+
+        return indices
+
+    operands = ()  # names of fields, values of which are arguments of a function returned by Processor.bind
+
+    def bind(self, backend):
+        """
+        Returns a function of operands' values which calculates own value on numbers of the backend. Processors
+        which don't define it are computed with Processor.compute element by element.
+        """
+        return None
+
+    def operand_sources(self, indices, backend, **kwargs):
+        """
+        Returns for each operand an index of a context, which gives its values, or a tuple with its constant value
+        converted to the backend. Raises NotComputableField if an operand can't be computed.
+        """
+        sources = []
+
+        for operand in self.operands:
+            field = getattr(self, operand)
+
+            if field['context'] or (field['index'] and field['value'] not in indices):
+                raise TeXCalcException.ComputeError.NotComputableField(
+                    index=kwargs.get('index', None),
+                    field=operand,
+                    processor_cls=self.Doc.verbose_name,
+                    processor=str(self)
+                )
+
+            if field['index']:
+                sources.append(field['value'])
+            else:
+                sources.append((backend.number(field['value']) if field['value'] is not None else None,))
+
+        return sources
+
+    def __compute_elementwise(self, indices, backend, **kwargs):
+        fields = [
+            getattr(self, field_name)['value']
+            for field_name in self.__fields().keys()
+            if getattr(self, field_name)['index']
+        ]
+
+        def function(*values):
+            return float(self.compute({
+                index: (Decimal(str(value)),)
+                for index, value in zip(fields, values)
+            }, **kwargs)[0])
+
+        function = backend.elementwise(function)
+
+        return tuple([
+            function(*values)
+            for values in product(*[indices[index] for index in fields])
+        ])
+
+    def compute_batch(self, indices, backend, **kwargs):
+        """ Calculates own values with an array backend, indices are tuples of children's arrays """
+        function = self.bind(backend)
+
+        if function is None:
+            return self.__compute_elementwise(indices, backend, **kwargs)
+
+        return tuple([
+            function(*values)
+            for values in product(*[
+                indices[source] if isinstance(source, int) else source
+                for source in self.operand_sources(indices, backend, **kwargs)
+            ])
+        ])
+
+
+def processor_name(processor_class):
+    """ Returns a name which identifies a class of processor in dumped context maps """
+    return f"{processor_class.__module__}:{processor_class.__qualname__}"
+
 
 class ContextProcessor:
     STATIC_OPERANDS = {
         r"\\pm": ('+', '-'),
         r"\\mp": ('-', '+'),
-        r"\\Phi": (Decimal('1.6180339887'),),
-        r"\\pi": (Decimal('3.1415926536'),),
+        r"\\Phi": (decimal_math.phi,),
+        r"\\pi": (decimal_math.pi,),
         r"\\Omega": (Decimal('0.0078749969'),),
+        r"\\e": (decimal_math.e,),  # a context of variable e, see TeXCalc.parser
     }
 
-    def __init__(self, texcalc_instance, context, index, variable_names=None, **kwargs):
-        self._computed = {}  # computations cache
+    _pat_arithmetic_token = re.compile(
+        r"@/(?P<index>\d+)/@|\\(?P<static>[a-zA-Z]+)|(?P<number>\d+\.?\d*|\.\d+)|(?P<operator>[-+*()])"
+    )
+    _pat_link = re.compile(r"@/(?P<index>\d+)/@")
+
+    def __init__(self, texcalc_instance, context, index, variable_names=None, indices=None, **kwargs):
+        self._computed = texcalc_instance.make_cache()  # computations cache
 
         if variable_names:
             if not isinstance(variable_names, tuple):
                 raise TeXCalcException.InitError.BadVariables()
         """
         An order and immutability of self._vars are important, cause of a key to computations results stored in
-        self._computed. The key is a tuple of variables' values in order that the variables' stored in self._vars.
+        self._computed. A key of a computation is a tuple of variables' values in order that the variables' stored
+        in self._vars, and a decimal context of the computation(or None) at the end. Each node stores results by
+        a part of the key, which has only values of variables used by the node, see ContextProcessor._key.
         """
         self._vars = variable_names
 
@@ -202,6 +373,21 @@ class ContextProcessor:
         self._context = context
         self._indices = set()  # all indices that exists in expression
         self._index = index
+        self._kernel = None  # prebuilt callable, see ContextProcessor.compile
+        self._combine = None
+        self._single = None  # computes one value from one value per each occurrence, see ContextProcessor.compile
+        self._occurrences = ()  # children in order of the product of their values in the kernel, with repeats
+        self._is_async = False  # does the node or any of its descendants await processors
+        self._used_vars = ()  # variables of the subtree of the node, see TeXCalc.compile_context_map
+        self._key = tuple  # takes the node's key from a key of a computation, see ContextProcessor.use_vars
+        self._resolved = False  # are _processor and _arithmetic found, see ContextProcessor.resolve
+        self._processor = None
+        self._arithmetic = None
+        self._arithmetic_functions = {}  # backend's name: functions, see ContextProcessor.arithmetic_functions
+
+        if indices is not None:
+            self._indices = set(indices)
+            return
 
         self._pat_index = re.compile(r"@/(?P<index>\d+)/@")
         tmp_context = context
@@ -215,90 +401,478 @@ class ContextProcessor:
             self._indices.add(int(sr.group('index')))
             tmp_context = tmp_context[sr.end():]
 
-    def __replace_static_operands(self):
-        """ Returns a tuple of all possible contexts with replaced static values from STATIC_OPERANDS"""
+    def __computation_key(self, **kwargs):
+        return *[str(kwargs[v]) for v in self._vars], None
+
+    def use_vars(self, used_vars):
+        """
+        Sets variables used by the subtree of the node, so its results are cached by values of only these variables
+        and a decimal context. Results of a node without variables are computed once, whatever a cache policy is.
+        """
+        self._used_vars = tuple([v for v in self._vars or () if v in used_vars])
+        self._key = itemgetter(*[self._vars.index(v) for v in self._used_vars], len(self._vars or ()))
 
-        replacements = [
-            (values, matched.span())
-            for static_operand_regexp, values in self.STATIC_OPERANDS.items()
-            for matched in re.finditer(static_operand_regexp, self._context)
-        ]
-        positions = tuple([replacement[1] for replacement in replacements])
+        if not self._used_vars and isinstance(self._computed, NoCache):
+            self._computed = Cache()
 
-        contexts = []
-        for replacement_values in product(*[replacement[0] for replacement in replacements]):
-            tmp_context = self._context
+    def __make_processor_kernel(self, processor, children):
+        """
+        Binds the function of the processor and its operands to the node once, so a computation neither creates
+        nor validates processors. Processors without Processor.bind are computed by Processor.compute.
+        Returns the kernel, the combining function and the single value function of the node, see
+        ContextProcessor.compile. Values of a bound processor are a product over its operands, so a child, which
+        is linked by several operands, is an occurrence per each of them.
+        """
+        index = self._index
 
-            for i in range(len(replacement_values)):
-                tmp_context = \
-                    f"{tmp_context[:positions[i][0]]}{replacement_values[i]}{tmp_context[positions[i][1]:]}"
+        def not_computable():
+            return TeXCalcException.ComputeError.NotComputableProcessor(
+                processor_cls=processor.Doc.verbose_name,
+                processor=str(processor),
+                index=index
+            )
 
-            contexts.append(tmp_context)
+        backend = self._texcalc_instance._backend
+        function = processor.bind(backend)
 
-        return tuple(contexts)
+        if function is None and processor.is_async:
+            async def combine(indices, variables):
+                try:
+                    values = await processor.compute(indices, index=index, **variables)
+                except asyncio.CancelledError:
+                    raise
+                except:
+                    raise not_computable()
 
-    def __computation_key(self, **kwargs):
-        return tuple([str(kwargs[v]) for v in self._vars])
+                return [backend.number(value) for value in values]
 
-    def __calculate_origin(self, **kwargs):
-        for processor_class in self._texcalc_instance._processors:
-            processor = processor_class.process(self._context, once=True)
+            def kernel(variables, key):
+                raise TeXCalcException.ComputeError.AsyncProcessor(
+                    processor_cls=processor.Doc.verbose_name,
+                    index=index
+                )
 
-            if not processor:
-                continue
-            else:
+            return kernel, combine, lambda values, variables, sign: kernel(variables, None)
+
+        if function is None:
+            def combine(indices, variables):
                 try:
-                    return processor.compute({
-                        index: self._texcalc_instance._context_map[index].compute(**kwargs)
-                        for index in self._indices
-                    }, index=self._index, **kwargs)
+                    return [backend.number(value) for value in processor.compute(indices, index=index, **variables)]
                 except:
-                    raise TeXCalcException.ComputeError.NotComputableProcessor(
-                        processor_cls=processor.Doc.verbose_name,
-                        processor=str(processor),
-                        index=self._index
-                    )
+                    raise not_computable()
+
+            def kernel(variables, key):
+                return combine({i: child._evaluate(variables, key) for i, child in children.items()}, variables)
+
+            def single(values, variables, sign):
+                return combine({i: (value,) for i, value in zip(children.keys(), values)}, variables)[0]
+
+            return kernel, combine, single
+
+        try:
+            sources = processor.operand_sources(children, backend, index=index)
+        except TeXCalcException.ComputeError:
+            def kernel(variables, key):
+                raise not_computable()
+
+            return kernel, lambda indices, variables: kernel(variables, None), lambda *args: kernel(None, None)
+
+        operands = tuple([children[source] if isinstance(source, int) else source for source in sources])
+        nodes = tuple([isinstance(source, int) for source in sources])
+        self._occurrences = tuple([source for source in sources if isinstance(source, int)])
+        many = getattr(function, 'many', None) if len(sources) == 1 else None  # see Backend.batchwise
+
+        def apply(options):
+            try:
+                if many is not None:
+                    return many(list(options[0]))
+
+                return [function(*values) for values in product(*options)]
+            except:
+                raise not_computable()
+
+        def combine(indices, variables):
+            return apply([indices[source] if is_node else source for source, is_node in zip(sources, nodes)])
+
+        def kernel(variables, key):
+            return apply([
+                operand._evaluate(variables, key) if is_node else operand
+                for operand, is_node in zip(operands, nodes)
+            ])
+
+        def single(values, variables, sign):
+            values = iter(values)
+
+            try:
+                return function(*[next(values) if is_node else source[0] for source, is_node in zip(sources, nodes)])
+            except:
+                raise not_computable()
+
+        return kernel, combine, single
 
-        # if the context is a single character variable
-        if self._context in kwargs.keys():
-            return (Decimal(str(kwargs[self._context])),)
+    def __make_variable_kernel(self):
+        name = self._context
 
+        def kernel(variables, key):
+            return variables[name],
+
+        def single(values, variables, sign):
+            return variables[name]
+
+        return kernel, lambda indices, variables: kernel(variables, None), single
+
+    def __make_not_computable_kernel(self):
+        context, index = self._context, self._index
+
+        def kernel(variables, key):
+            raise TeXCalcException.ComputeError.NotComputableContext(context=context, index=index)
+
+        return kernel, lambda indices, variables: kernel(variables, None), lambda *args: kernel(None, None)
+
+    def __parse_arithmetic(self):
         """
-        If we're here, it means that context is a string which have only indexed items of hashmap, 
+        If we're here, it means that context is a string which have only indexed items of hashmap,
         operations of addition and subtraction, constants from STATIC_OPERANDS.
-        Or it can be a start value of counter i=<some>
+        Or it can be a start value of counter i=<some>.
+
+        Returns a list of pieces: names, operators and tuples for sign options of STATIC_OPERANDS, and a dict of
+        constants used in it, or None if the context isn't an arithmetic expression.
         """
-        pat = re.compile(r'i=(?P<context>.*)')
-        result = pat.fullmatch(self._context)
+        context = self._context
+        result = re.fullmatch(r'i=(?P<context>.*)', context)
         if result:
-            self._context = result.group('context')
+            context = result.group('context')
 
-        contexts_to_process = self.__replace_static_operands()
-        index_options = tuple([
-            (index, self._texcalc_instance._context_map[index].compute(**kwargs))
-            for index in self._indices
-        ])
-        values_options = tuple(product(*[i[1] for i in index_options]))
+        constants = {}
+        pieces = []
+        position = 0
+        prev_is_operand = False
+
+        for matched in self._pat_arithmetic_token.finditer(context):
+            if matched.start() != position:
+                return None
+
+            position = matched.end()
+            static = matched.group('static')
+            operator = matched.group('operator')
+
+            if static is not None:
+                values = self.STATIC_OPERANDS.get(f"\\\\{static}", None)
+
+                if values is None:
+                    return None
+                elif all([isinstance(value, str) for value in values]):
+                    pieces.append(values)
+                    prev_is_operand = False
+                    continue
+
+                name = f"_{static}"
+                constants[name] = f"\\\\{static}" if callable(values[0]) else values[0]  # see arithmetic_constants
+            elif operator is not None:
+                if operator == '(' and prev_is_operand:
+                    pieces.append('*')
+
+                pieces.append(operator)
+                prev_is_operand = operator == ')'
+                continue
+            elif matched.group('number') is not None:
+                name = f"_c{len(constants)}"
+                constants[name] = Decimal(matched.group('number'))
+            else:
+                name = f"_{matched.group('index')}"
+
+            if prev_is_operand:
+                pieces.append('*')  # implicit multiplication, e.g. 4ac
+
+            pieces.append(name)
+            prev_is_operand = True
+
+        if position != len(context) or not pieces:
+            return None
+
+        return pieces, constants
+
+    def arithmetic_functions(self, backend):
+        """
+        Returns functions of a tuple of children's values(in order of sorted indices), one per each combination of
+        STATIC_OPERANDS signs. Constants are converted to numbers of the backend. See TeXCalc.arithmetic.
+        """
+        if backend.name in self._arithmetic_functions:
+            return self._arithmetic_functions[backend.name]
+
+        self._arithmetic_functions[backend.name] = arithmetic.compile_functions(
+            self._arithmetic[0],
+            [f"_{i}" for i in sorted(self._indices)],
+            {name: backend.number(value) for name, value in self.arithmetic_constants().items()}
+        )
+        return self._arithmetic_functions[backend.name]
+
+    def arithmetic_constants(self):
+        """
+        Returns a dict of numbers of constants of the arithmetic. Constants of STATIC_OPERANDS, like π, are stored
+        by their names and computed in the decimal context of the instance, like folded constants of TeXCalc.optimize.
+        """
+        with self._texcalc_instance.decimal_context():
+            return {
+                name: self.STATIC_OPERANDS[value][0]() if isinstance(value, str) else value
+                for name, value in self._arithmetic[1].items()
+            }
+
+    def __make_arithmetic_kernel(self, children):
+        """
+        The context was tokenized once and turned into a function per each combination of STATIC_OPERANDS signs,
+        so computing of the node is just a call of that function on values of the children.
+        """
+        try:
+            functions = self.arithmetic_functions(self._texcalc_instance._backend)
+        except SyntaxError:
+            self._arithmetic = None
+            return self.__make_not_computable_kernel()
+
+        order = tuple(children.keys())
+        children = tuple(children.values())
+
+        def combine(indices, variables):
+            values_options = tuple(product(*[indices[i] for i in order]))
+
+            return [function(value_option) for function in functions for value_option in values_options]
+
+        def kernel(variables, key):
+            values_options = tuple(product(*[child._evaluate(variables, key) for child in children]))
+
+            return [function(value_option) for function in functions for value_option in values_options]
+
+        return kernel, combine, lambda values, variables, sign: functions[sign](tuple(values))
+
+    def resolve(self):
+        """ Finds a processor of the context or parses it as arithmetic expression, if it isn't a variable """
+        self._processor = None
+        self._arithmetic = None
+
+        for processor_class in self._texcalc_instance._processors:
+            processor = processor_class.process(self._context, once=True)
+
+            if processor:
+                self._processor = processor
+                break
+        else:
+            if not self.is_variable:
+                self._arithmetic = self.__parse_arithmetic()
+
+        self._resolved = True
+
+    def compile(self):
+        """
+        Prebuilds a callable which calculates values of the node from values of its children. All the regular
+        expressions are applied only once in ContextProcessor.resolve, so further computations do only arithmetic.
+
+        The kernel evaluates children itself, while the combining function gets their values in a dict by indices,
+        so they may be computed elsewhere, e.g. awaited by ContextProcessor._aevaluate. The single value function
+        computes one value of a single branch from a value per each occurrence of children(see
+        ContextProcessor._occurrences) and a number of a combination of own ± signs, see TeXCalc.branch_count.
+        """
+        if not self._resolved:
+            self.resolve()
+
+        context_map = self._texcalc_instance._context_map
+        children = {index: context_map[index] for index in sorted(self._indices)}
+        self._arithmetic_functions = {}
+        self._occurrences = tuple(children.keys())
+
+        if self._processor is not None:
+            self._kernel, self._combine, self._single = self.__make_processor_kernel(self._processor, children)
+        elif self.is_variable:
+            self._kernel, self._combine, self._single = self.__make_variable_kernel()
+        elif self._arithmetic is None:
+            self._kernel, self._combine, self._single = self.__make_not_computable_kernel()
+        else:
+            self._kernel, self._combine, self._single = self.__make_arithmetic_kernel(children)
+
+        self._is_async = inspect.iscoroutinefunction(self._combine)
+
+    def relink(self, links):
+        """
+        Replaces links to children by links: indices of other nodes, or constant values, which are inlined into
+        arithmetic, or into operands of the processor, if it's bound by Processor.bind. See TeXCalc.optimize.
+        """
+        links = {
+            index: link if isinstance(link, int) else Decimal(str(link))
+            for index, link in links.items()
+            if index in self._indices
+        }
+
+        if self._processor is not None and self._processor.bind(self._texcalc_instance._backend) is None:
+            links = {index: link for index, link in links.items() if isinstance(link, int)}
+
+        if not links:
+            return
+
+        if self._processor is not None:
+            self._indices = self._processor.relink(links)
+        elif self._arithmetic is not None:
+            pieces, constants = self._arithmetic
+            constants = dict(constants)
+            names = {}
+
+            for index, link in links.items():
+                if isinstance(link, int):
+                    names[f"_{index}"] = f"_{link}"
+                else:
+                    names[f"_{index}"] = f"_k{index}"
+                    constants[f"_k{index}"] = link
+
+            self._arithmetic = (
+                [names.get(piece, piece) if isinstance(piece, str) else piece for piece in pieces],
+                constants
+            )
+            self._indices = {
+                links.get(index, index)
+                for index in self._indices
+                if isinstance(links.get(index, index), int)
+            }
+        else:
+            return
+
+        def replace(matched):
+            link = links.get(int(matched.group('index')), None)
+
+            if link is None:
+                return matched.group()
 
-        calculated = []
+            return f"@/{link}/@" if isinstance(link, int) else f"({link})"
+
+        self._context = self._pat_link.sub(replace, self._context)
+        self._kernel = None
+
+    def signature(self):
+        """
+        Returns a hashable structure of the resolved node, which is equal for nodes computing the same values
+        by the same children. Not computable nodes are never equal. See TeXCalc.optimize.
+        """
+        if self._processor is not None:
+            return processor_name(type(self._processor)), json.dumps(self._processor.dump(), sort_keys=True)
+
+        if self.is_variable:
+            return 'variable', self._context
+
+        if self._arithmetic is not None:
+            pieces, constants = self._arithmetic
+            indices = sorted(self._indices)
+
+            try:
+                tree = arithmetic.Parser(pieces, [f"_{i}" for i in indices]).parse()
+            except SyntaxError:
+                return 'context', self._index
+
+            return 'arithmetic', arithmetic.canonical(tree, indices, constants)
+
+        return 'context', self._index
+
+    def dump(self):
+        """ Returns the resolved node as a json-compatible dict, see ContextProcessor.load """
+        if not self._resolved:
+            self.resolve()
+
+        record = {'index': self._index, 'context': self._context, 'indices': sorted(self._indices)}
+
+        if self._processor is not None:
+            record['processor'] = processor_name(type(self._processor))
+            record['fields'] = self._processor.dump()
+        elif self._arithmetic is not None:
+            pieces, constants = self._arithmetic
+            record['arithmetic'] = (
+                [list(piece) if isinstance(piece, tuple) else piece for piece in pieces],
+                {name: str(value) for name, value in constants.items()}
+            )
+
+        return record
+
+    @classmethod
+    def load(cls, texcalc_instance, record, processors):
+        """
+        Restores a node dumped by ContextProcessor.dump without any parsing. Processors is a dict of processors'
+        classes by their names, see processor_name.
+        """
+        context_processor = cls(
+            texcalc_instance,
+            record['context'],
+            record['index'],
+            variable_names=texcalc_instance._vars,
+            indices=record['indices']
+        )
+
+        if 'processor' in record:
+            if record['processor'] not in processors:
+                raise TeXCalcException.SerializationError.UnknownProcessor(processor=record['processor'])
+
+            context_processor._processor = processors[record['processor']].load(
+                record['fields'],
+                matched=record['context'],
+                context=record['context']
+            )
+        elif 'arithmetic' in record:
+            pieces, constants = record['arithmetic']
+            context_processor._arithmetic = (
+                [tuple(piece) if isinstance(piece, list) else piece for piece in pieces],
+                {name: value if value in cls.STATIC_OPERANDS else Decimal(value) for name, value in constants.items()}
+            )
+
+        context_processor._resolved = True
+        return context_processor
+
+    @property
+    def signs(self):
+        """ A number of ± sign options of arithmetic of the node, each of them doubles branches of the expression """
+        if self._processor is not None or self._arithmetic is None:
+            return 0
+
+        return len([piece for piece in self._arithmetic[0] if isinstance(piece, tuple)])
+
+    @property
+    def is_variable(self):
+        """ Is the context a single character variable """
+        return bool(self._vars) and self._context in self._vars
+
+    def compute_batch(self, indices, variables, backend):
+        """
+        Computes the node with an array backend. Indices is a dict of children's values, where each value is
+        a tuple of arrays, one per ± branch. Returns a tuple of arrays too, without deduplication of branches.
+        """
+        if self._kernel is None:
+            self.compile()
+
+        if self._processor is not None:
+            try:
+                return self._processor.compute_batch(indices, backend, index=self._index)
+            except TeXCalcException.ComputeError:
+                raise
+            except:
+                raise TeXCalcException.ComputeError.NotComputableProcessor(
+                    processor_cls=self._processor.Doc.verbose_name,
+                    processor=str(self._processor),
+                    index=self._index
+                )
 
-        for context in contexts_to_process:
-            for value_option in values_options:
-                tmp_context = context.replace("@@", "@*@")
+        if self.is_variable:
+            return variables[self._context],
 
-                for i in range(len(index_options)):
-                    tmp_context = tmp_context.replace(f"@/{index_options[i][0]}/@", str(value_option[i]))
+        if self._arithmetic is None:
+            raise TeXCalcException.ComputeError.NotComputableContext(context=self._context, index=self._index)
 
-                calculated.append(Decimal(str(eval(tmp_context))))
+        values_options = tuple(product(*[indices[index] for index in sorted(self._indices)]))
 
-        return tuple(calculated)
+        return tuple([
+            function(value_option)
+            for function in self.arithmetic_functions(backend)
+            for value_option in values_options
+        ])
 
     def is_computed_on(self, **kwargs):
         for v in self._vars:
             if not v in kwargs:
                 raise TeXCalcException.UserError.NotEnoughVariables(var_name=v)
 
-        return self.__computation_key(**kwargs) in self._computed
+        return self._key(self.__computation_key(**kwargs)) in self._computed
 
     def get_not_calculated_indices_for(self, **kwargs):
         indices = set()
@@ -309,19 +883,64 @@ class ContextProcessor:
 
         return tuple(indices)
 
-    def compute(self, **kwargs):
-        computation_key = self.__computation_key(**kwargs)
+    def _evaluate(self, variables, key):
+        """ Computes the node on already prepared variables' values and computation key """
+        node_key = self._key(key)
+        result = self._computed.get(node_key)
+        if result is not None:
+            return result
+
+        if self._kernel is None:
+            self.compile()
+
+        result = distinct(self._kernel(variables, key))
+        self._computed.set(node_key, result)
+        return result
+
+    async def _aevaluate(self, variables, key, tasks):
+        """
+        Computes the node like ContextProcessor._evaluate, but awaits asynchronous processors. Children with
+        asynchronous descendants are awaited concurrently, and tasks(a dict of them by indices) are shared by
+        the whole computation, so each node is computed once. Synchronous subtrees are just evaluated.
+        """
+        if not self._is_async:
+            return self._evaluate(variables, key)
+
+        node_key = self._key(key)
+        result = self._computed.get(node_key)
+        if result is not None:
+            return result
+
+        context_map = self._texcalc_instance._context_map
+        indices = {}
+
+        for index in self._indices:
+            if context_map[index]._is_async:
+                if index not in tasks:
+                    tasks[index] = asyncio.ensure_future(context_map[index]._aevaluate(variables, key, tasks))
+            else:
+                indices[index] = context_map[index]._evaluate(variables, key)
+
+        awaited = [index for index in self._indices if index not in indices]
+        indices.update(zip(awaited, await asyncio.gather(*[tasks[index] for index in awaited])))
 
-        while not self.is_computed_on(**kwargs):
-            indices = self.get_not_calculated_indices_for(**kwargs)
+        result = self._combine(indices, variables)
+        if inspect.isawaitable(result):
+            result = await result
 
-            if len(indices) == 0:
-                self._computed[computation_key] = tuple(set(self.__calculate_origin(**kwargs)))
+        result = distinct(result)
+        self._computed.set(node_key, result)
+        return result
 
-            for index in indices:
-                self._texcalc_instance._context_map[index].compute(**kwargs)
+    def compute(self, **kwargs):
+        for v in self._vars:
+            if not v in kwargs:
+                raise TeXCalcException.UserError.NotEnoughVariables(var_name=v)
 
-        return self._computed[computation_key]
+        return self._evaluate(
+            {v: self._texcalc_instance._backend.number(kwargs[v]) for v in self._vars},
+            self.__computation_key(**kwargs)
+        )
 
 
 class Constant(Processor):
@@ -336,10 +955,15 @@ class Constant(Processor):
 
     value = DecimalField()
 
+    operands = ('value',)
+
     @Processor.validate(not_context=('value',), index_exist=('value',))
     def compute(self, indices, **kwargs):
         return self.value['value'],
 
+    def bind(self, backend):
+        return lambda value: value
+
 
 class TrigFunction(Processor):
     _register = True
@@ -353,18 +977,12 @@ class TrigFunction(Processor):
 
     parameter = DecimalField(indexed=True)
     function = Field(choices={
-        'sin': lambda x: Decimal(str(math.sin(Decimal(str(x))))),
-        'cos': lambda x: Decimal(str(math.cos(Decimal(str(x))))),
-        'tan': lambda x: Decimal(str(math.tan(Decimal(str(x))))),
-        'cot': lambda x: Decimal('1') / Decimal(str(math.tan(Decimal(str(x))))),
-        'sec': lambda x: Decimal('1') / Decimal(str(math.cos(Decimal(str(x))))),
-        'csc': lambda x: Decimal('1') / Decimal(str(math.sin(Decimal(str(x))))),
-        'sinh': lambda x: Decimal(str(math.sinh(Decimal(str(x))))),
-        'cosh': lambda x: Decimal(str(math.cosh(Decimal(str(x))))),
-        'tanh': lambda x: Decimal(str(math.tanh(Decimal(str(x))))),
-        'coth': lambda x: Decimal('1') / Decimal(str(math.tanh(Decimal(str(x)))))
+        name: decimal_backend.functions[name]
+        for name in ('sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'sinh', 'cosh', 'tanh', 'coth')
     })
 
+    operands = ('parameter',)
+
     @Processor.validate(not_context=('parameter',), index_exist=('parameter',))
     def compute(self, indices, **kwargs):
         if not self.parameter['index']:
@@ -372,6 +990,9 @@ class TrigFunction(Processor):
         else:
             return tuple([self.function['value'](parameter) for parameter in indices[self.parameter['value']]])
 
+    def bind(self, backend):
+        return backend.functions[self.function['choice']]
+
 
 class InverseTrigFunction(TrigFunction):
     _register = True
@@ -385,12 +1006,8 @@ class InverseTrigFunction(TrigFunction):
 
     parameter = DecimalField(indexed=True)
     function = Field(choices={
-        'arcsin': lambda x: Decimal(str(math.asin(Decimal(str(x))))),
-        'arccos': lambda x: Decimal(str(math.acos(Decimal(str(x))))),
-        'arctan': lambda x: Decimal(str(math.atan(Decimal(str(x))))),
-        'arccot': lambda x: (Decimal(str(math.pi)) / Decimal('2')) - Decimal(str(math.atan(Decimal(str(x))))),
-        'arcsec': lambda x: Decimal(str(math.acos(Decimal('1') / Decimal(str(x))))),
-        'arccsc': lambda x: Decimal(str(math.asin(Decimal('1') / Decimal(str(x))))),
+        name: decimal_backend.functions[name]
+        for name in ('arcsin', 'arccos', 'arctan', 'arccot', 'arcsec', 'arccsc')
     })
 
 
@@ -406,11 +1023,9 @@ class Logarithm(Processor):
 
     base = DecimalField(indexed=True)
     parameter = DecimalField(indexed=True)
-    function = Field(choices={
-        'lg': lambda x, base: Decimal(str(math.log10(Decimal(str(x))))),
-        'ln': lambda x, base: Decimal(str(math.log(Decimal(str(x))))),
-        'log': lambda x, base: Decimal(str(math.log(Decimal(str(x)), Decimal(str(base))))),
-    })
+    function = Field(choices={name: decimal_backend.functions[name] for name in ('lg', 'ln', 'log')})
+
+    operands = ('parameter', 'base')
 
     @Processor.validate(not_context=('parameter', 'base'), index_exist=('parameter', 'base'))
     def compute(self, indices, **kwargs):
@@ -433,6 +1048,9 @@ class Logarithm(Processor):
                 for base in indices[self.base['value']]
             ])
 
+    def bind(self, backend):
+        return backend.functions[self.function['choice']]
+
 
 class Fraction(Processor):
     _register = True
@@ -447,6 +1065,8 @@ class Fraction(Processor):
     numerator = DecimalField(indexed=True)
     denominator = DecimalField(indexed=True)
 
+    operands = ('numerator', 'denominator')
+
     @Processor.validate(not_context=('numerator', 'denominator'), index_exist=('numerator', 'denominator'))
     def compute(self, indices, **kwargs):
         if not self.numerator['index'] and not self.denominator['index']:
@@ -468,6 +1088,9 @@ class Fraction(Processor):
                 for denominator in indices[self.denominator['value']]
             ])
 
+    def bind(self, backend):
+        return lambda numerator, denominator: numerator / denominator
+
 
 class Exponentiation(Processor):
     _register = True
@@ -483,6 +1106,8 @@ class Exponentiation(Processor):
     value = DecimalField(context=True, indexed=True)
     exponent = DecimalField(indexed=True)
 
+    operands = ('value', 'exponent')
+
     # TODO: Simplify all compute functions because there are repeated validations
     @Processor.validate(not_context=('value', 'exponent'), index_exist=('value', 'exponent'))
     def compute(self, indices, **kwargs):
@@ -505,6 +1130,9 @@ class Exponentiation(Processor):
                 for exponent in indices[self.exponent['value']]
             ])
 
+    def bind(self, backend):
+        return backend.functions['power']
+
 
 class Sqrt(Processor):
     _register = True
@@ -519,6 +1147,8 @@ class Sqrt(Processor):
     exponent = DecimalField(indexed=True, default=Decimal('2'))
     value = DecimalField(indexed=True)
 
+    operands = ('value', 'exponent')
+
     @Processor.validate(not_context=('value', 'exponent'), index_exist=('value',))
     def compute(self, indices, **kwargs):
         if not self.value['index'] and not self.exponent['index']:
@@ -576,6 +1206,9 @@ class Sqrt(Processor):
                 for exponent in indices[self.exponent['value']]
             ])
 
+    def bind(self, backend):
+        return backend.functions['root']
+
 
 """
 class Sum(Processor):
@@ -621,6 +1254,11 @@ class Prod(Processor):
 # Processors with possibility of custom logic creation:
 
 class CustomFunction(Processor):
+    """
+    A base of custom processors like name(x), see FibonacciFunction. Instances of processors are slotted, but ones
+    defined outside TeXCalc have __dict__ for their own attributes too. Set instance_dict = False on a subclass to
+    save memory of its instances, or instance_dict = True to keep __dict__ in any module.
+    """
     _register = False
     _custom = True
 
@@ -644,30 +1282,78 @@ class FibonacciFunction(CustomFunction):
 
     parameter = DecimalField(indexed=True)
 
+    operands = ('parameter',)
+
+    STEPS_PER_BIT = 4  # a position is reached by steps from a previous one, if it's closer than that per bit
+
+    _pairs = LRUCache(maxsize=FIBONACCI_CACHE_MAXSIZE)  # n: (F(n), F(n + 1)), shared by all instances
+
+    @classmethod
+    def _pair(cls, n):
+        """ Returns (F(n), F(n + 1)) by fast doubling, so in O(log n) multiplications """
+        if n == 0:
+            return 0, 1
+
+        pair = cls._pairs.get(n)
+        if pair is not None:
+            return pair
+
+        a, b = cls._pair(n >> 1)
+        c = a * (2 * b - a)  # F(2k)
+        d = a * a + b * b  # F(2k + 1)
+        pair = (d, c + d) if n & 1 else (c, d)
+
+        cls._pairs.set(n, pair)
+        return pair
+
+    @staticmethod
+    def _position(parameter):
+        parameter = int(parameter)
+
+        if parameter < 1:
+            raise TeXCalcException.ComputeError.InvalidFibonacciPosition(parameter=parameter)
+
+        return parameter
+
+    @classmethod
+    def fibonacci(cls, parameter):
+        return cls._pair(cls._position(parameter))[0]
+
+    @classmethod
+    def fibonacci_many(cls, parameters):
+        """
+        Returns elements of the sequence by the positions in their order. The least position is computed by fast
+        doubling, and each next one is reached by steps from the previous one, unless it's too far.
+        """
+        positions = [cls._position(parameter) for parameter in parameters]
+        values = {}
+        previous, pair = None, None
+
+        for position in sorted(set(positions)):
+            if previous is None or position - previous > cls.STEPS_PER_BIT * position.bit_length():
+                pair = cls._pair(position)
+            else:
+                a, b = pair
+                for _ in range(position - previous):
+                    a, b = b, a + b
+                pair = (a, b)
+
+            values[position] = pair[0]
+            previous = position
+
+        return [values[position] for position in positions]
+
     @Processor.validate(not_context=('parameter',), index_exist=('parameter',))
     def compute(self, indices, **kwargs):
         parameters = (
-            [int(self.parameter['value'])]
-            if not self.parameter['index'] else [int(i) for i in indices[int(self.parameter['value'])]]
+            [self.parameter['value']]
+            if not self.parameter['index'] else indices[int(self.parameter['value'])]
         )
-        answers = []
-
-        for parameter in parameters:
-            if parameter < 1:
-                raise TeXCalcException.ComputeError.InvalidFibonacciPosition(parameter=parameter)
-
-            prev = 1
-            curr = 1
-            for i in range(3, parameter + 1):
-                if parameter < 3:
-                    answers.append(Decimal('1'))
-                    break
-
-                tmp = curr
 
-                curr += prev
-                prev = tmp
+        return tuple([Decimal(value) for value in self.fibonacci_many(parameters)])
 
-            answers.append(Decimal(str(curr)))
+    def bind(self, backend):
+        def function(parameters):
+            return [backend.number(value) for value in self.fibonacci_many(parameters)]
 
-        return tuple(answers)
+        return backend.batchwise(function)
@@ -0,0 +1,203 @@
+"""
+A profiler of nodes of a context map. When it's started, ContextProcessor._evaluate of each node is shadowed by
+an attribute of the node, which computes the same and records time of the computation. Kernels of parents call
+_evaluate of children by the attribute, so all synchronous computations of the expression(calls, TeXCalc.map and
+TeXCalc.imap with caches) are recorded. When it's stopped, the attributes are removed, so a disabled profiler
+costs nothing. Asynchronous nodes aren't recorded, only their synchronous subtrees.
+"""
+import threading
+from collections import Counter
+from time import perf_counter
+
+from .exceptions import TeXCalcException
+from .processors import distinct
+
+
+class NodeStats:
+    """ Stats of a node, or of all nodes of a kind, where branches is the largest number of values of a node """
+    __slots__ = ('calls', 'cumulative', 'own', 'hits', 'misses', 'branches')
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative = 0.0
+        self.own = 0.0  # self time, without children
+        self.hits = 0
+        self.misses = 0
+        self.branches = 0
+
+    def add(self, other):
+        self.calls += other.calls
+        self.cumulative += other.cumulative
+        self.own += other.own
+        self.hits += other.hits
+        self.misses += other.misses
+        self.branches = max(self.branches, other.branches)
+
+    def dump(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def node_kind(context_processor):
+    """ Returns a name of the processor class of the node, 'variable' or 'arithmetic' """
+    if context_processor._processor is not None:
+        return type(context_processor._processor).__name__
+
+    return 'variable' if context_processor.is_variable else 'arithmetic'
+
+
+class Profiler:
+    """
+    ... with func.profile() as profiler:
+    ...     func(a=1, b=-8, c=15)
+    ... print(profiler.report())
+    Records calls, cumulative and self time, cache hits and misses, and branches of nodes of the TeXCalc instance,
+    see TeXCalc.profile. Self time of nodes is also recorded per each stack of nodes, see Profiler.collapsed.
+    Counters are shared by threads without locks, so they're approximate for concurrent computations.
+    """
+    SORT_KEYS = ('own', 'cumulative', 'calls', 'misses')
+
+    def __init__(self, texcalc_instance):
+        self._texcalc_instance = texcalc_instance
+        self._local = threading.local()  # a stack of computed nodes per thread
+        self._profiled = ()
+        self.nodes = {}  # index: NodeStats
+        self.kinds = {}  # index: kind of the node
+        self.stacks = Counter()  # a tuple of frames: self time
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def enabled(self):
+        return bool(self._profiled)
+
+    def start(self):
+        func = self._texcalc_instance
+
+        if func._compiled_context_map is not func._context_map:
+            func.compile_context_map()
+
+        self.stop()
+        self._profiled = tuple(func._context_map.values())
+
+        for context_processor in self._profiled:
+            if not context_processor._is_async:
+                context_processor._evaluate = self.__profiled_evaluate(context_processor)
+
+        return self
+
+    def stop(self):
+        for context_processor in self._profiled:
+            context_processor.__dict__.pop('_evaluate', None)
+
+        self._profiled = ()
+        return self
+
+    def clear(self):
+        self.nodes.clear()
+        self.stacks.clear()
+
+    def __stack(self):
+        stack = getattr(self._local, 'stack', None)
+
+        if stack is None:
+            stack = self._local.stack = []
+
+        return stack
+
+    def __profiled_evaluate(self, context_processor):
+        """ Returns ContextProcessor._evaluate of the node, which records its stats """
+        index = context_processor._index
+        frame_name = f"{node_kind(context_processor)}#{index}"
+        stats = self.nodes.setdefault(index, NodeStats())
+        self.kinds[index] = node_kind(context_processor)
+
+        def evaluate(variables, key):
+            stack = self.__stack()
+            frame = [frame_name, 0.0]  # a name and time of children
+            stack.append(frame)
+            started = perf_counter()
+
+            try:
+                node_key = context_processor._key(key)
+                result = context_processor._computed.get(node_key)
+
+                if result is None:
+                    if context_processor._kernel is None:
+                        context_processor.compile()
+
+                    result = distinct(context_processor._kernel(variables, key))
+                    context_processor._computed.set(node_key, result)
+                    stats.misses += 1
+                else:
+                    stats.hits += 1
+
+                stats.branches = max(stats.branches, len(result))
+                return result
+            finally:
+                elapsed = perf_counter() - started
+                own = elapsed - frame[1]
+
+                self.stacks[tuple([name for name, _ in stack])] += own
+                stack.pop()
+
+                if stack:
+                    stack[-1][1] += elapsed
+
+                stats.calls += 1
+                stats.cumulative += elapsed
+                stats.own += own
+
+        return evaluate
+
+    def by_kind(self):
+        """ Returns stats summed per each kind of nodes(a processor class, 'variable' or 'arithmetic') """
+        kinds = {}
+
+        for index, stats in self.nodes.items():
+            kinds.setdefault(self.kinds[index], NodeStats()).add(stats)
+
+        return kinds
+
+    def dump(self):
+        """ Returns the stats as a json-compatible dict """
+        return {
+            'nodes': {index: dict(kind=self.kinds[index], **stats.dump()) for index, stats in self.nodes.items()},
+            'kinds': {kind: stats.dump() for kind, stats in self.by_kind().items()},
+        }
+
+    def report(self, sort='own', limit=None):
+        """ Returns a text table of nodes and another one of kinds of nodes, sorted by the stat in descending order """
+        if sort not in self.SORT_KEYS:
+            raise TeXCalcException.UserError.BadSortKey(sort=sort, supported=self.SORT_KEYS)
+
+        header = f"{'calls':>9} {'hits':>9} {'misses':>9} {'branches':>8} {'cumulative, s':>14} {'self, s':>12}"
+
+        def line(stats):
+            return (
+                f"{stats.calls:>9} {stats.hits:>9} {stats.misses:>9} {stats.branches:>8} "
+                f"{stats.cumulative:>14.6f} {stats.own:>12.6f}"
+            )
+
+        nodes = sorted(self.nodes.items(), key=lambda item: getattr(item[1], sort), reverse=True)[:limit]
+        kinds = sorted(self.by_kind().items(), key=lambda item: getattr(item[1], sort), reverse=True)
+
+        return "\n".join(
+            [f"{'index':>6} {'kind':<20} {header}"]
+            + [f"{index:>6} {self.kinds[index]:<20} {line(stats)}" for index, stats in nodes]
+            + ["", f"{'kind':<27} {header}"]
+            + [f"{kind:<27} {line(stats)}" for kind, stats in kinds]
+        )
+
+    def collapsed(self):
+        """
+        Returns self time of stacks of nodes in the collapsed stack format of flame graph tools(like flamegraph.pl
+        or speedscope): a line per stack with names of frames from the root separated by ';' and microseconds.
+        """
+        return "\n".join([
+            f"{';'.join(stack)} {round(own * 1e6)}"
+            for stack, own in sorted(self.stacks.items())
+        ])
@@ -0,0 +1,135 @@
+import json
+import os
+import re
+
+from .exceptions import TeXCalcException
+from .processors import Processor, ContextProcessor, processor_name
+
+
+FORMAT = 'texcalc'
+FORMAT_VERSION = 1
+
+FORMULA_EXTENSION = '.tex'
+COMPILED_EXTENSION = '.texc'
+
+
+def dumps(texcalc_instance):
+    """ Returns a compiled expression(context map with bound processors, without caches) as a json string """
+    if texcalc_instance._compiled_context_map is not texcalc_instance._context_map:
+        texcalc_instance.compile_context_map()
+
+    return json.dumps({
+        'format': FORMAT,
+        'version': FORMAT_VERSION,
+        'variables': texcalc_instance._vars,
+        'custom_processors': [
+            processor_name(processor_class)
+            for processor_class in texcalc_instance._custom_processors
+        ],
+        'context_map': [
+            context_processor.dump()
+            for context_processor in texcalc_instance._context_map.values()
+        ],
+    }, separators=(',', ':'))
+
+
+def loads(texcalc_class, data, custom_processors=(), **kwargs):
+    """
+    Creates an instance of texcalc_class from a string made by dumps. No regular expressions are applied, nodes
+    get their processors and arithmetic straight from the data. Custom processors must be passed again.
+    """
+    data = json.loads(data)
+
+    if data.get('format', None) != FORMAT or data.get('version', None) != FORMAT_VERSION:
+        raise TeXCalcException.SerializationError.UnsupportedFormat(
+            format=data.get('format', None),
+            version=data.get('version', None),
+            supported_format=FORMAT,
+            supported_version=FORMAT_VERSION
+        )
+
+    processors = {
+        processor_name(processor_class): processor_class
+        for processor_class in (*Processor._subclasses, *custom_processors)
+    }
+
+    for name in data['custom_processors']:
+        if name not in processors:
+            raise TeXCalcException.SerializationError.UnknownProcessor(processor=name)
+
+    texcalc_instance = texcalc_class(
+        variables=tuple(data['variables']) if data['variables'] is not None else None,
+        custom_processors=tuple([processors[name] for name in data['custom_processors']]),
+        skip_context_processing=True,
+        **kwargs
+    )
+
+    texcalc_instance._context_map = {
+        record['index']: ContextProcessor.load(texcalc_instance, record, processors)
+        for record in data['context_map']
+    }
+    texcalc_instance.compile_context_map()
+
+    return texcalc_instance
+
+
+def restore(texcalc_class, data, custom_processors, options):
+    """ Unpickles a TeXCalc instance, see TeXCalc.__reduce__ """
+    return loads(texcalc_class, data, custom_processors=custom_processors, **options)
+
+
+def read_formula(path, variables=None):
+    """
+    Reads a formula from .tex file. Lines starting with % are comments, and the line '% variables: a, b'
+    defines variables of the formula. Passed variables are used for formulas without that line.
+    """
+    lines = []
+    declared = None
+
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            line = line.strip()
+
+            if not line.startswith('%'):
+                lines.append(line)
+                continue
+
+            matched = re.fullmatch(r'%\s*variables\s*:(?P<variables>.*)', line)
+            if matched:
+                declared = tuple([v for v in re.split(r'[\s,]+', matched.group('variables')) if v])
+
+    variables = declared if declared is not None else variables
+
+    if variables is None:
+        raise TeXCalcException.SerializationError.NoVariables(path=path)
+
+    return " ".join(lines), variables
+
+
+def precompile_directory(texcalc_class, source, destination=None, variables=None, custom_processors=()):
+    """
+    Compiles every .tex formula in the source directory and writes it next to the formula(or to destination)
+    as a .texc file, which is loaded by TeXCalc.load. Returns paths of written files.
+    """
+    destination = destination or source
+    os.makedirs(destination, exist_ok=True)
+    written = []
+
+    for filename in sorted(os.listdir(source)):
+        if not filename.endswith(FORMULA_EXTENSION):
+            continue
+
+        expression, formula_variables = read_formula(os.path.join(source, filename), variables=variables)
+        texcalc_instance = texcalc_class(
+            expression,
+            variables=formula_variables,
+            custom_processors=custom_processors
+        )
+
+        path = os.path.join(destination, f"{filename[:-len(FORMULA_EXTENSION)]}{COMPILED_EXTENSION}")
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(dumps(texcalc_instance))
+
+        written.append(path)
+
+    return written
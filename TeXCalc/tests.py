@@ -1,7 +1,38 @@
+import asyncio
+import contextlib
+import importlib
+import io
+import math
+import os
+import pickle
+import re
+import sys
+import tempfile
+import threading
+import time
 import unittest
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from unittest import mock
 
-from .processors import Processor, Constant, TrigFunction, Logarithm, Exponentiation, FibonacciFunction
-from .core import avoid_parentheses
+from decimal import Decimal, ROUND_UP, getcontext, localcontext
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import arithmetic, decimal_math, precompile, serialization
+from .cache import LRUCache, LFUCache, NoCache
+from .fields import DecimalField
+from .processors import (
+    ProcessorMetaclass, Processor, ContextProcessor, CustomFunction, Constant, TrigFunction, Logarithm, Exponentiation,
+    Fraction, Sqrt, FibonacciFunction
+)
+from .core import TeXCalc, avoid_parentheses
+from .exceptions import TeXCalcException
+from .parser import Parser
 
 
 class AvoidParentBracketsTestCase(unittest.TestCase):
@@ -136,5 +167,855 @@ class FibonacciFunctionTestCase(ProcessorTestCase):
     )
 
 
+class FieldTestCase(unittest.TestCase):
+    def test_values_on_instances(self):
+        first = TrigFunction.process("\\sin@/1/@", once=True)
+        second = TrigFunction.process("\\cos@/2/@", once=True)
+
+        self.assertEqual((first.parameter['value'], first.function['choice']), (1, 'sin'))
+        self.assertEqual((second.parameter['value'], second.function['choice']), (2, 'cos'))
+        self.assertFalse(hasattr(first, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            first.rate = 1
+
+    def test_instance_dict(self):
+        class RatedFunction(CustomFunction):
+            name = "rated"
+            instance_dict = True
+
+            parameter = DecimalField(indexed=True)
+
+        class UserFunction(CustomFunction):
+            __module__ = 'formulas'
+            name = "user"
+
+            parameter = DecimalField(indexed=True)
+
+        class SlottedFunction(CustomFunction):
+            __module__ = 'formulas'
+            instance_dict = False
+            name = "slotted"
+
+            parameter = DecimalField(indexed=True)
+
+        for processor_class in (RatedFunction, UserFunction):
+            processor = processor_class.process(f"{processor_class.name}@/1/@", once=True)
+            processor.rate = 1
+
+            self.assertEqual(processor.__dict__, {'rate': 1})
+            self.assertEqual(processor.parameter['value'], 1)
+
+        self.assertFalse(hasattr(SlottedFunction.process("slotted@/1/@", once=True), '__dict__'))
+
+    def test_processor_is_freed(self):
+        processor = TrigFunction.process("\\sin@/1/@", once=True)
+        reference = weakref.ref(processor)
+        del processor
+
+        self.assertIsNone(reference())
+
+
+class ParserTestCase(unittest.TestCase):
+    """ Parser must make the same nodes as the regex rewriting of the context map, up to their indices """
+    expressions = (
+        ("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", ('a', 'b', 'c')),
+        ("\\frac{1}{4}(3\\sin{a} - \\sin{3a})", ('a',)),
+        ("fib(x) - \\log_{2}{\\sqrt[3]{x - 1} + 2}", ('x',)),
+        ("2\\sin{\\frac{a + b}{2}}\\cos{\\frac{a - b}{2}}", ('a', 'b')),
+    )
+
+    @staticmethod
+    def expand(contexts):
+        """ Replaces links to other contexts by their expanded contexts, so indices don't matter """
+        expanded = {}
+
+        def expand(index):
+            if index not in expanded:
+                expanded[index] = re.sub(r"@/(\d+)/@", lambda m: f"{{{expand(int(m.group(1)))}}}", contexts[index])
+
+            return expanded[index]
+
+        return {index: expand(index) for index in contexts}
+
+    def test_contexts(self):
+        for expression, variables in self.expressions:
+            parsed = Parser(expression, variables=variables, custom_names=('fib',)).parse()
+
+            func = TeXCalc(variables=variables, custom_processors=(FibonacciFunction,), skip_context_processing=True)
+            func._TeXCalc__expr = expression
+            func._TeXCalc__rewrite_context_map()
+            rewritten = {index: context_processor._context for index, context_processor in func._context_map.items()}
+
+            self.assertEqual(self.expand(parsed)[0], self.expand(rewritten)[0])
+            self.assertEqual(set(self.expand(parsed).values()), set(self.expand(rewritten).values()))
+
+
+class ArithmeticTestCase(unittest.TestCase):
+    def test_functions(self):
+        pieces = ['-', '_1', ('+', '-'), '_2', '*', '(', '_c0', '-', '-', '_1', ')']
+        functions = arithmetic.compile_functions(pieces, ('_1', '_2'), {'_c0': Decimal('0.1')})
+
+        self.assertEqual(
+            [function((Decimal('0.2'), Decimal('3'))) for function in functions],
+            [Decimal('0.7'), Decimal('-1.1')]
+        )
+
+    def test_not_arithmetic(self):
+        for pieces in (['_1', '+'], ['(', '_1'], ['_1', ')'], ['*', '_1']):
+            with self.assertRaises(SyntaxError):
+                arithmetic.compile_functions(pieces, ('_1',), {})
+
+
+class ExpressionsMixin:
+    """ Instances of TeXCalc for the expressions, which are created with options of a test case """
+    expressions = (
+        ("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", ('a', 'b', 'c'), {'a': 1, 'b': -8, 'c': 15}),
+        ("2\\sin{\\frac{a + b}{2}}\\cos{\\frac{a - b}{2}}", ('a', 'b'), {'a': -TeXCalc.pi / 6, 'b': TeXCalc.pi / 2}),
+        ("fib(x) - \\log_{2}{\\sqrt[3]{x - 1} + 2}", ('x',), {'x': 9}),
+        ("2\\pi r", ('r',), {'r': 2}),
+    )
+    right_results = (
+        {Decimal('3'), Decimal('5')},
+        {Decimal('0.5')},
+        {Decimal('32')},
+        {Decimal('12.56637')},
+    )
+
+    options = {}
+
+    def setUp(self):
+        self.functions = tuple(
+            TeXCalc(expression, variables=variables, custom_processors=(FibonacciFunction,), **self.options)
+            for expression, variables, _ in self.expressions
+        )
+
+
+class TeXCalcTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_results(self):
+        for i in range(len(self.right_results)):
+            self.assertEqual(set(self.functions[i](**self.expressions[i][2])), self.right_results[i])
+
+    def test_cached_results(self):
+        for i in range(len(self.right_results)):
+            self.assertEqual(self.functions[i](**self.expressions[i][2]), self.functions[i](**self.expressions[i][2]))
+
+    def test_compiled(self):
+        for func in self.functions:
+            for context_processor in func._context_map.values():
+                self.assertIsNotNone(context_processor._kernel)
+
+
+class FloatBackendTestCase(ExpressionsMixin, unittest.TestCase):
+    options = {'backend': 'float'}
+
+    def test_float_results(self):
+        for i in range(len(self.right_results)):
+            answers = self.functions[i](**self.expressions[i][2])
+
+            self.assertTrue(all([isinstance(answer, float) for answer in answers]))
+            self.assertEqual({Decimal(str(answer)) for answer in answers}, self.right_results[i])
+
+
+class ConcurrencyTestCase(unittest.TestCase):
+    expression = "\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}"
+    rows = [(1, -(i % 50) - 6, i % 7) for i in range(1000)]
+
+    def test_map(self):
+        func = TeXCalc(self.expression, variables=('a', 'b', 'c'), cache_maxsize=16)
+        expected = [func(a=a, b=b, c=c) for a, b, c in self.rows]
+
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual(func.map(self.rows, executor=executor, chunksize=50), expected)
+
+        self.assertEqual(func.map([{'a': 1, 'b': -8, 'c': 15}]), [func(a=1, b=-8, c=15)])
+
+    def test_shared_caches(self):
+        for policy in ('lru', 'lfu', 'unbounded'):
+            func = TeXCalc(self.expression, variables=('a', 'b', 'c'), cache=policy, cache_maxsize=8)
+
+            with ThreadPoolExecutor(8) as executor:
+                results = func.map(self.rows, executor=executor, chunksize=10)
+
+            self.assertEqual(results, TeXCalc(self.expression, variables=('a', 'b', 'c')).map(self.rows))
+
+    def test_lazy_compilation(self):
+        func = TeXCalc(self.expression, variables=('a', 'b', 'c'))
+        func._context_map = dict(func._context_map)  # a context map passed afterwards is compiled lazily
+        barrier = threading.Barrier(8)
+        compile_once = ContextProcessor.compile
+
+        def compute(branch):
+            barrier.wait()
+            return func(a=1, b=-8, c=15, branch=branch % 2)
+
+        def slow_compile(context_processor):
+            time.sleep(0.001)  # other threads wait for the lock meanwhile
+            compile_once(context_processor)
+
+        with mock.patch.object(ContextProcessor, 'compile', autospec=True, side_effect=slow_compile) as compile_node:
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(compute, range(8)))
+
+        self.assertEqual(compile_node.call_count, len(func._context_map))
+        self.assertEqual(results, [(Decimal('5'),), (Decimal('3'),)] * 4)
+
+
+class IMapTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_imap(self):
+        for i in range(len(self.right_results)):
+            for cache in (True, False):
+                self.functions[i].cache_clear()
+                results = self.functions[i].imap(({**self.expressions[i][2]} for _ in range(5)), chunk=2, cache=cache)
+
+                self.assertEqual(set(next(results)), self.right_results[i])
+                self.assertEqual(self.functions[i].cache_info().currsize, len(self.functions[i]._order) * cache)
+
+
+class GridTestCase(unittest.TestCase):
+    def test_grid(self):
+        func = TeXCalc("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", variables=('a', 'b', 'c'))
+        axes = {'a': [1, 2], 'b': range(-12, -8), 'c': [1, 3, 5]}
+
+        self.assertEqual(
+            func.grid(**axes, round=3),
+            [func(a=a, b=b, c=c, round=3) for a, b, c in product(*axes.values())]
+        )
+        self.assertEqual(func.grid(a=1, b=-8, c=[15]), [func(a=1, b=-8, c=15)])
+
+    def test_used_vars(self):
+        func = TeXCalc("\\sqrt{b^{2} - 4ac} + \\sin{d}", variables=('a', 'b', 'c', 'd'))
+        used_vars = {context_processor._used_vars for context_processor in func._context_map.values()}
+
+        self.assertEqual(func._context_map[0]._used_vars, ('a', 'b', 'c', 'd'))
+        self.assertTrue({('a', 'b', 'c'), ('b',), ('d',), ()} <= used_vars)
+
+
+class SweepTestCase(unittest.TestCase):
+    def setUp(self):
+        self.func = TeXCalc(
+            "fib(x) - \\log_{2}{\\sqrt[3]{x - 1} + 2}",
+            variables=('x',),
+            custom_processors=(FibonacciFunction,),
+            cache='lfu',
+            precision=20
+        )
+
+    def test_pickle(self):
+        self.func(x=9)
+        func = pickle.loads(pickle.dumps(self.func))
+
+        self.assertEqual(func._options, self.func._options)
+        self.assertEqual(func.cache_info().currsize, 0)
+        self.assertEqual(func(x=9), self.func(x=9))
+
+    def test_sweep(self):
+        rows = [(x,) for x in range(2, 60)]
+
+        self.assertEqual(list(self.func.sweep(iter(rows), processes=2, chunksize=7)), self.func.map(rows))
+
+
+class RateFunction(CustomFunction):
+    """ Looks rates up asynchronously, like in a remote service """
+    class Doc:
+        verbose_name = "Rate"
+        example = "rate(x)"
+        description = "Returns a rate by its number."
+
+    name = "rate"
+
+    parameter = DecimalField(indexed=True)
+
+    rates = {1: Decimal('0.5'), 2: Decimal('2')}
+    lookups = [0, 0]  # current and the most concurrent lookups
+
+    @Processor.validate(not_context=('parameter',), index_exist=('parameter',))
+    async def compute(self, indices, **kwargs):
+        self.lookups[0] += 1
+        self.lookups[1] = max(self.lookups)
+        await asyncio.sleep(0.01)
+        self.lookups[0] -= 1
+
+        return tuple([self.rates[int(value)] for value in indices[self.parameter['value']]])
+
+
+class AsyncTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_acompute(self):
+        for i in range(len(self.right_results)):
+            answers = asyncio.run(self.functions[i].acompute(**self.expressions[i][2]))
+
+            self.assertEqual(set(answers), self.right_results[i])
+
+    def test_async_processor(self):
+        func = TeXCalc("rate(x) + 3rate(y)", variables=('x', 'y'), custom_processors=(RateFunction,))
+
+        RateFunction.lookups[1] = 0
+
+        self.assertEqual(asyncio.run(func.acompute(x=1, y=2)), (Decimal('6.5'),))
+        self.assertEqual(RateFunction.lookups[1], 2)
+
+        with self.assertRaises(TeXCalcException.ComputeError):
+            func(x=2, y=1)
+
+    def test_astream(self):
+        func = TeXCalc("\\frac{rate(x)}{y}", variables=('x', 'y'), custom_processors=(RateFunction,), cache=None)
+
+        async def collect():
+            return [result async for result in func.astream([(1, 1), {'x': 2, 'y': 4}, (2, 1)], concurrency=2)]
+
+        self.assertEqual(asyncio.run(collect()), [(Decimal('0.5'),), (Decimal('0.5'),), (Decimal('2'),)])
+
+
+class DecimalMathTestCase(unittest.TestCase):
+    pi = Decimal('3.14159265358979323846264338327950288419716939937510582097494459')
+    sin_1 = Decimal('0.84147098480789650665250232163029899962256306079837106567275171')
+
+    def test_precision(self):
+        with localcontext() as context:
+            context.prec = 50
+
+            self.assertEqual(decimal_math.pi(), +self.pi)
+            self.assertEqual(decimal_math.sin(Decimal(1)), +self.sin_1)
+            self.assertEqual(decimal_math.atan(Decimal(1)) * 4, +self.pi)
+            self.assertEqual(decimal_math.asin(Decimal('0.5')) * 6, +self.pi)
+            self.assertEqual(decimal_math.cos(+self.pi), Decimal(-1))
+            self.assertEqual(
+                decimal_math.sin(Decimal('1e22')),
+                Decimal('-0.85220084976718880177270589375302936826176215041004')
+            )
+
+    def test_pi_cache(self):
+        with localcontext() as context:
+            context.prec = 30
+
+            for exponent in range(decimal_math.PI_CACHE_MAXSIZE + 10):
+                decimal_math.sin(Decimal(f'1e{exponent}'))
+
+        self.assertLessEqual(decimal_math._pi.cache_info().currsize, decimal_math.PI_CACHE_MAXSIZE)
+
+    def test_math(self):
+        functions = (
+            (decimal_math.sin, math.sin), (decimal_math.cos, math.cos), (decimal_math.tan, math.tan),
+            (decimal_math.atan, math.atan), (decimal_math.asin, math.asin), (decimal_math.acos, math.acos),
+            (decimal_math.sinh, math.sinh), (decimal_math.cosh, math.cosh), (decimal_math.tanh, math.tanh),
+        )
+
+        for function, math_function in functions:
+            for x in (-0.99, -0.3, 1e-12, 0.5, 0.9):
+                self.assertAlmostEqual(float(function(Decimal(x))), math_function(x), places=14)
+
+        with self.assertRaises(ValueError):
+            decimal_math.asin(Decimal(2))
+
+    def test_float_precision(self):
+        with localcontext() as context:
+            context.prec = 12
+
+            self.assertEqual(decimal_math.sin(Decimal(1)), +self.sin_1)
+            self.assertEqual(decimal_math.log(Decimal(8), Decimal(2)), Decimal(3))
+            self.assertEqual(decimal_math.exp(Decimal(1000)).adjusted(), 434)  # overflows floats
+
+            with self.assertRaises(ValueError):
+                decimal_math.ln(Decimal(-1))
+
+    def test_constants(self):
+        func = TeXCalc("x\\sin{\\frac{\\pi}{6}}", variables=('x',), precision=50)
+        euler = TeXCalc("e^{x} - \\Phi \\Phi + \\Phi", variables=('e', 'x'), precision=50)
+
+        self.assertEqual(func(x=1, round=45), (Decimal('0.5'),))
+        self.assertEqual(TeXCalc.loads(func.dumps(), precision=50)(x=1, round=45), (Decimal('0.5'),))
+
+        with localcontext() as context:
+            context.prec = 50
+            self.assertEqual(euler(e=0, x=1, round=45), (round(Decimal(1).exp() - 1, 45),))
+
+    def test_call(self):
+        func = TeXCalc("\\sin{x} + \\arctan{x} + \\ln{x}", variables=('x',))
+
+        self.assertEqual(
+            func(x=2, precision=50, round=45),
+            (Decimal('2.709593325179717507830317447548458450847802751'),)
+        )
+
+
+class DecimalContextTestCase(unittest.TestCase):
+    def test_precision(self):
+        prec = getcontext().prec
+        func = TeXCalc("\\frac{x}{3}", variables=('x',), precision=3)
+
+        self.assertEqual(func(x=1, round=10), (Decimal('0.333'),))
+        self.assertEqual(func(x=1, round=10, precision=6), (Decimal('0.333333'),))
+        self.assertEqual(func(x=1, round=10, rounding=ROUND_UP), (Decimal('0.334'),))
+        self.assertEqual(func(x=1, round=10), (Decimal('0.333'),))
+        self.assertEqual(getcontext().prec, prec)
+
+    def test_bad_precision(self):
+        with self.assertRaises(TeXCalcException.InitError):
+            TeXCalc("\\frac{x}{3}", variables=('x',), precision=0)
+
+
+class FibonacciTestCase(unittest.TestCase):
+    @staticmethod
+    def linear(n):
+        a, b = 1, 1
+        for _ in range(n - 1):
+            a, b = b, a + b
+
+        return a
+
+    def test_fast_doubling(self):
+        for n in (1, 2, 3, 10, 81, 1000, 1001):
+            self.assertEqual(FibonacciFunction.fibonacci(n), self.linear(n))
+
+        with self.assertRaises(TeXCalcException.ComputeError):
+            FibonacciFunction.fibonacci(0)
+
+    def test_many(self):
+        positions = [90, 3, 1000, 95, 3, 100000]
+
+        self.assertEqual(
+            FibonacciFunction.fibonacci_many(positions),
+            [FibonacciFunction.fibonacci(n) for n in positions]
+        )
+
+    def test_branches(self):
+        for backend in ('decimal', 'float'):
+            func = TeXCalc("fib(x \\pm 2)", variables=('x',), custom_processors=(FibonacciFunction,), backend=backend)
+
+            with mock.patch.object(FibonacciFunction, 'fibonacci_many', wraps=FibonacciFunction.fibonacci_many) as many:
+                self.assertEqual(func(x=10), (144, 21))
+
+            self.assertEqual(many.call_count, 1)
+
+    @unittest.skipIf(numpy is None, "numpy isn't installed")
+    def test_batch(self):
+        func = TeXCalc("fib(x) + y", variables=('x', 'y'), custom_processors=(FibonacciFunction,))
+        answers = func.evaluate_batch(x=numpy.array([[10, 80], [3, 10]]), y=numpy.zeros((2, 2)))
+
+        self.assertEqual(answers[0].tolist(), [[55.0, float(self.linear(80))], [2.0, 55.0]])
+
+
+class BindTestCase(unittest.TestCase):
+    expression = "\\sqrt{x} + \\log_{2}{x \\pm 1} + \\sin{\\frac{x}{2}}\\cos{x}^{2} + fib(x)"
+    processors = (Sqrt, Logarithm, Fraction, TrigFunction, Exponentiation, FibonacciFunction)
+
+    def test_hot_evaluations(self):
+        for backend in ('decimal', 'float'):
+            func = TeXCalc(
+                self.expression,
+                variables=('x',),
+                custom_processors=(FibonacciFunction,),
+                backend=backend,
+                cache=None
+            )
+            answers = func(x=3)
+
+            with contextlib.ExitStack() as stack:
+                instantiate = stack.enter_context(mock.patch.object(ProcessorMetaclass, '__call__'))
+                computes = [  # Processor.validate checks operands on calls of compute
+                    stack.enter_context(mock.patch.object(
+                        processor_class, 'compute', autospec=True, side_effect=processor_class.compute
+                    ))
+                    for processor_class in self.processors
+                ]
+
+                self.assertEqual(func(x=3), answers)
+                func(x=8)
+
+            self.assertEqual(instantiate.call_count, 0)
+            self.assertEqual([compute.call_count for compute in computes], [0] * len(self.processors))
+
+
+@unittest.skipIf(numpy is None, "numpy isn't installed")
+class EvaluateBatchTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_batch_results(self):
+        for i in range(len(self.right_results)):
+            variables = {name: numpy.array([value] * 3) for name, value in self.expressions[i][2].items()}
+            answers = self.functions[i].evaluate_batch(**variables)
+
+            self.assertEqual({round(Decimal(float(answer[0])), 5) for answer in answers}, self.right_results[i])
+            self.assertTrue(all([answer.shape == (3,) for answer in answers]))
+
+
+class CacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = LRUCache(maxsize=2)
+        cache.set(1, (1,))
+        cache.set(2, (2,))
+        cache.get(1)
+        cache.set(3, (3,))
+
+        self.assertEqual((1 in cache, 2 in cache, 3 in cache), (True, False, True))
+        self.assertEqual(cache.info()[:4], (1, 0, 1, 2))
+
+    def test_lfu(self):
+        cache = LFUCache(maxsize=2)
+        cache.set(1, (1,))
+        cache.set(2, (2,))
+        cache.get(1)
+        cache.get(1)
+        cache.get(2)
+        cache.set(3, (3,))
+
+        self.assertEqual((1 in cache, 2 in cache, 3 in cache), (True, False, True))
+        self.assertEqual(cache.get(4), None)
+        self.assertEqual(cache.info()[:4], (3, 1, 1, 2))
+
+    def test_disabled(self):
+        cache = NoCache()
+        cache.set(1, (1,))
+
+        self.assertEqual(cache.get(1), None)
+        self.assertEqual(cache.info().misses, 1)
+
+    def test_texcalc_policy(self):
+        func = TeXCalc("\\sqrt{x} + 1", variables=('x',), cache='lru', cache_maxsize=2)
+
+        for x in (1, 4, 9, 4):
+            func(x=x)
+
+        info = func.cache_info()
+        self.assertTrue(info.evictions > 0)
+        self.assertTrue(info.currsize <= 2 * len(func._context_map))
+        self.assertEqual(func(x=16), (Decimal('5.00000'),))
+
+        func.cache_clear()
+        self.assertEqual(func.cache_info()[:4], (0, 0, 0, 0))
+
+
+class UsedVarsCacheTestCase(unittest.TestCase):
+    def test_partial_keys(self):
+        func = TeXCalc("\\sqrt{b^{2} - 4ac} + \\sin{d}", variables=('a', 'b', 'c', 'd'))
+        func(a=1, b=-8, c=15, d=1)
+        misses = func.cache_info().misses
+
+        func(a=1, b=-8, c=15, d=2)  # only \\sin{d} and the main expression are computed
+        self.assertEqual(func.cache_info().misses - misses, 3)
+
+    def test_constants(self):
+        func = TeXCalc("\\frac{1}{4}x", variables=('x',), cache=None)
+        constant = [
+            context_processor for context_processor in func._context_map.values()
+            if context_processor._context.startswith('\\frac')
+        ][0]
+
+        self.assertEqual(func(x=4), (Decimal('1'),))
+        self.assertEqual(func(x=8), (Decimal('2'),))
+        self.assertEqual(constant._computed.info()[:2], (1, 1))
+
+
+class OptimizeTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_optimized_results(self):
+        for i in range(len(self.right_results)):
+            self.functions[i].optimize()
+
+            self.assertEqual(set(self.functions[i](**self.expressions[i][2])), self.right_results[i])
+
+    def test_removed_nodes(self):
+        func = TeXCalc("\\frac{1}{4}x + 2^{10} + \\sqrt{a + x} - \\sqrt{x + a}", variables=('a', 'x'))
+        size = len(func._context_map)
+
+        self.assertEqual(func.optimize(), size - 5)  # a, x, x+a, \\sqrt and the main expression are left
+        self.assertEqual(func(a=1, x=2), (Decimal('1024.5'),))
+        self.assertEqual(func.optimize(), 0)
+
+
+class BranchTestCase(unittest.TestCase):
+    def test_branches(self):
+        func = TeXCalc("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", variables=('a', 'b', 'c'))
+
+        self.assertEqual(func.branch_count, 2)
+        self.assertEqual(func(a=1, b=-8, c=15), (Decimal('5'), Decimal('3')))
+        self.assertEqual(func(a=1, b=-8, c=15, branch=1), (Decimal('3'),))
+        self.assertEqual(func(a=1, b=-6, c=9), (Decimal('3'),))  # equal branches are merged
+
+    def test_nested_branches(self):
+        func = TeXCalc("(a \\pm b)(c \\pm 1) \\pm 1", variables=('a', 'b', 'c'))
+        branches = [func(a=1, b=2, c=3, branch=k)[0] for k in range(func.branch_count)]
+
+        self.assertEqual(func.branch_count, 8)
+        self.assertEqual(func(a=1, b=2, c=3), tuple(dict.fromkeys(branches)))
+        self.assertEqual(branches[0], Decimal('13'))  # all first signs
+
+        with self.assertRaises(TeXCalcException.UserError):
+            func(a=1, b=2, c=3, branch=8)
+
+    def assertBranches(self, func, count, **variables):
+        branches = [func(**variables, branch=k)[0] for k in range(func.branch_count)]
+
+        self.assertEqual(func.branch_count, count)
+        self.assertEqual(func(**variables), tuple(dict.fromkeys(branches)))
+
+    def test_processor_branches(self):
+        func = TeXCalc("\\log_{2 \\pm a}{b \\pm c}", variables=('a', 'b', 'c'))
+
+        self.assertBranches(func, 4, a=0.5, b=5, c=3)
+        self.assertEqual(func(a=0.5, b=5, c=3, branch=1), (Decimal('5.12853'),))  # log_{2-a}{b+c}, base is the last
+
+    def test_repeated_branches(self):
+        self.assertBranches(
+            TeXCalc("(c \\pm d) + \\frac{a \\pm b}{c \\pm d}", variables=('a', 'b', 'c', 'd')),
+            8, a=1, b=2, c=5, d=3
+        )
+        self.assertBranches(TeXCalc("\\frac{1 \\pm x}{2} + \\sqrt{1 \\pm x}", variables=('x',)), 4, x=0.5)
+        self.assertBranches(
+            TeXCalc("\\frac{1 \\pm x}{2} + \\sqrt{1 \\pm x}", variables=('x',), optimize=True),
+            4, x=0.5
+        )
+
+
+    def test_shared_work(self):
+        func = TeXCalc("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", variables=('a', 'b', 'c'))
+        func(a=1, b=-8, c=15)
+        hits, misses = func.cache_info()[:2]
+
+        self.assertEqual(func(a=1, b=-8, c=15, branch=1), (Decimal('3'),))
+        self.assertEqual(func.cache_info()[1], misses)  # subtrees without ± signs are taken from caches
+        self.assertGreater(func.cache_info()[0], hits)
+
+        func = TeXCalc("(c \\pm d) + \\frac{a \\pm b}{c \\pm d}", variables=('a', 'b', 'c', 'd'))
+        node = func._context_map[func._context_map[0]._occurrences[0]]  # c \\pm d
+        node._single = mock.Mock(wraps=node._single)
+
+        self.assertEqual(func(a=1, b=2, c=5, d=3, branch=0), (Decimal('8.375'),))
+        self.assertEqual(node._single.call_count, 1)  # c + d of both occurrences is computed once
+
+class GradientTestCase(unittest.TestCase):
+    expression = "\\sin{x}\\ln{y} + \\log_{y}{x} + x^{y} + \\arctan{xy} + \\sqrt[3]{x} + \\frac{\\cos{x}}{y}"
+
+    def test_quadratic(self):
+        func = TeXCalc("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", variables=('a', 'b', 'c'))
+
+        self.assertEqual(func.value_and_grad(a=1, b=-8, c=15), (
+            (Decimal('5'), {'a': Decimal('-12.5'), 'b': Decimal('-2.5'), 'c': Decimal('-0.5')}),
+            (Decimal('3'), {'a': Decimal('4.5'), 'b': Decimal('1.5'), 'c': Decimal('0.5')}),
+        ))
+
+    def test_power_at_zero(self):
+        for backend in ('decimal', 'float'):
+            for expression, grad in (("x^{1}", 1), ("x^{2}", 0), ("x^{1} + x^{3}", 1)):
+                func = TeXCalc(expression, variables=('x',), backend=backend)
+
+                self.assertEqual(func.value_and_grad(x=0), ((0, {'x': grad}),))
+
+    def test_precision(self):
+        TeXCalc("\\lg{x}", variables=('x',)).value_and_grad(x=3)  # the shared dual backend is made in this context
+
+        func = TeXCalc("\\lg{x}", variables=('x',), precision=50)
+        ((_, grad),) = func.value_and_grad(x=3, round=45)
+
+        with localcontext() as context:
+            context.prec = 50
+            self.assertEqual(grad['x'], round(1 / (3 * Decimal(10).ln()), 45))
+
+    def test_finite_differences(self):
+        func = TeXCalc(self.expression, variables=('x', 'y'), backend='float')
+        ((value, grad),) = func.value_and_grad(x=2, y=3, round=15)
+        h = 1e-6
+
+        self.assertEqual(value, func(x=2, y=3, round=15)[0])
+        self.assertAlmostEqual(grad['x'], (func(x=2 + h, y=3, round=15)[0] - func(x=2 - h, y=3, round=15)[0]) / (2 * h))
+        self.assertAlmostEqual(grad['y'], (func(x=2, y=3 + h, round=15)[0] - func(x=2, y=3 - h, round=15)[0]) / (2 * h))
+
+    @unittest.skipIf(numpy is None, "numpy isn't installed")
+    def test_batch(self):
+        func = TeXCalc(self.expression, variables=('x', 'y'), backend='float')
+        ((values, grads),) = func.value_and_grad_batch(x=numpy.array([2.0, 0.5]), y=3)
+
+        for i, x in enumerate((2.0, 0.5)):
+            ((value, grad),) = func.value_and_grad(x=x, y=3, round=15)
+
+            self.assertAlmostEqual(values[i], value)
+            self.assertAlmostEqual(grads['x'][i], grad['x'])
+            self.assertAlmostEqual(grads['y'][i], grad['y'])
+
+    def test_not_differentiable(self):
+        func = TeXCalc("y fib(3)", variables=('y',), custom_processors=(FibonacciFunction,))
+        self.assertEqual(func.value_and_grad(y=2), ((Decimal('4'), {'y': Decimal('2')}),))
+
+        func = TeXCalc("fib(x) + y", variables=('x', 'y'), custom_processors=(FibonacciFunction,))
+        with self.assertRaises(TeXCalcException.ComputeError):
+            func.value_and_grad(x=3, y=2)
+
+
+class CodegenTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_generated_results(self):
+        for i in range(len(self.right_results)):
+            expression, variables, values = self.expressions[i]
+            generated = self.functions[i].to_callable()
+
+            self.assertEqual(
+                tuple([round(answer, TeXCalc.DEFAULT_ROUND) for answer in generated(*[values[v] for v in variables])]),
+                self.functions[i](**values)
+            )
+
+    def test_float_branches(self):
+        generated = self.functions[0].to_callable(backend='float', name='roots')
+
+        self.assertEqual(generated(1, -8, 15), (5.0, 3.0))
+        self.assertEqual(generated(1, -6, 9), (3.0,))
+
+    def test_branches_order(self):
+        for expression, variables, values in (
+            ("\\log_{2 \\pm a}{b \\pm c}", ('a', 'b', 'c'), {'a': 0.5, 'b': 5, 'c': 3}),
+            ("\\log_{3 \\pm a}{3 \\pm a}", ('a',), {'a': 1}),
+            ("(c \\pm d) + \\frac{a \\pm b}{c \\pm d}", ('a', 'b', 'c', 'd'), {'a': 1, 'b': 2, 'c': 5, 'd': 3}),
+        ):
+            func = TeXCalc(expression, variables=variables)
+            generated = func.to_callable()
+
+            self.assertEqual(
+                tuple([round(answer, TeXCalc.DEFAULT_ROUND) for answer in generated(*values.values())]),
+                func(**values)
+            )
+
+    def test_module(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'generated_roots.py'), 'w') as file:
+                file.write(self.functions[0].to_python_source(backend='float', name='roots'))
+
+            sys.path.insert(0, directory)
+            try:
+                self.assertEqual(importlib.import_module('generated_roots').roots(1, -8, 15), (5.0, 3.0))
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop('generated_roots', None)
+
+    def test_not_generatable(self):
+        with self.assertRaises(TeXCalcException.ComputeError):
+            TeXCalc("rate(x) + 3", variables=('x',), custom_processors=(RateFunction,)).to_python_source()
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def test_profile(self):
+        func = TeXCalc("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}", variables=('a', 'b', 'c'))
+
+        with func.profile() as profiler:
+            func(a=1, b=-8, c=15)
+            func(a=1, b=-8, c=15)
+
+        self.assertEqual(profiler.nodes[0].calls, 2)
+        self.assertEqual((profiler.nodes[0].hits, profiler.nodes[0].misses), (1, 1))
+        self.assertEqual(profiler.nodes[0].branches, 2)
+        self.assertEqual(profiler.by_kind()['Fraction'].calls, 2)
+        self.assertTrue(all([stats.cumulative >= stats.own >= 0 for stats in profiler.nodes.values()]))
+        self.assertIn('Fraction#0 ', profiler.collapsed())
+        self.assertTrue(all([re.fullmatch(r'[\w#;]+ \d+', line) for line in profiler.collapsed().split('\n')]))
+
+        func(a=2, b=-8, c=6)  # stopped
+
+        self.assertEqual(profiler.nodes[0].calls, 2)
+        self.assertNotIn('_evaluate', func._context_map[0].__dict__)
+
+        with self.assertRaises(TeXCalcException.UserError):
+            profiler.report(sort='name')
+
+
+class CompileTestCase(unittest.TestCase):
+    expression = "\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}"
+
+    def setUp(self):
+        TeXCalc.compile_cache_clear()
+
+    def test_shared(self):
+        func = TeXCalc.compile(self.expression, variables=('a', 'b', 'c'))
+
+        self.assertIs(func, TeXCalc.compile(self.expression, variables=('a', 'b', 'c')))
+        self.assertIsNot(func, TeXCalc.compile(self.expression, variables=('a', 'b', 'c'), cache='lfu'))
+        self.assertEqual(TeXCalc.compile_cache_info()[:2], (1, 2))
+        self.assertEqual(set(func(a=1, b=-8, c=15)), {Decimal('3'), Decimal('5')})
+
+    def test_subclass(self):
+        class SubCalc(TeXCalc):
+            pass
+
+        func = TeXCalc.compile(self.expression, variables=('a', 'b', 'c'))
+        sub_func = SubCalc.compile(self.expression, variables=('a', 'b', 'c'))
+
+        self.assertIsInstance(sub_func, SubCalc)
+        self.assertIs(type(func), TeXCalc)
+        self.assertIs(sub_func, SubCalc.compile(self.expression, variables=('a', 'b', 'c')))
+
+    def test_read_only(self):
+        func = TeXCalc.compile(self.expression, variables=('a', 'b', 'c'), optimize=True)
+        func(a=1, b=-8, c=15)
+
+        for method in (func.optimize, func.profile, func.cache_clear, func.compile_context_map):
+            with self.assertRaises(TeXCalcException.UserError):
+                method()
+
+        self.assertGreater(func.cache_info().currsize, 0)
+        self.assertEqual(set(func(a=1, b=-8, c=15)), {Decimal('3'), Decimal('5')})
+        self.assertEqual(set(pickle.loads(pickle.dumps(func))(a=1, b=-8, c=15)), {Decimal('3'), Decimal('5')})
+        self.assertEqual(TeXCalc.loads(func.dumps()).optimize(), 0)
+
+
+class SerializationTestCase(ExpressionsMixin, unittest.TestCase):
+    def test_loaded_results(self):
+        for i in range(len(self.right_results)):
+            func = TeXCalc.loads(self.functions[i].dumps(), custom_processors=(FibonacciFunction,))
+
+            self.assertEqual(set(func(**self.expressions[i][2])), self.right_results[i])
+            self.assertEqual(func.dumps(), self.functions[i].dumps())
+
+
+class PrecompileTestCase(unittest.TestCase):
+    formulas = {
+        'roots.tex': "% variables: a, b, c\n\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}\n{2a}\n",
+        'fib.tex': "% Fibonacci numbers\nfib(x)\n",
+    }
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        for filename, formula in self.formulas.items():
+            with open(os.path.join(self.directory.name, filename), 'w', encoding='utf-8') as fh:
+                fh.write(formula)
+
+    def path(self, *names):
+        return os.path.join(self.directory.name, *names)
+
+    def load(self, *names):
+        with open(self.path(*names), encoding='utf-8') as fh:
+            return TeXCalc.load(fh, custom_processors=(FibonacciFunction,))
+
+    def test_read_formula(self):
+        roots = ("\\frac{-b \\pm \\sqrt{b^{2} - 4ac}} {2a}", ('a', 'b', 'c'))
+
+        self.assertEqual(serialization.read_formula(self.path('roots.tex')), roots)
+        self.assertEqual(serialization.read_formula(self.path('roots.tex'), variables=('x',)), roots)
+        self.assertEqual(serialization.read_formula(self.path('fib.tex'), variables=('x',)), ("fib(x)", ('x',)))
+
+        with self.assertRaises(TeXCalcException.SerializationError):
+            serialization.read_formula(self.path('fib.tex'))
+
+    def test_precompile_directory(self):
+        written = serialization.precompile_directory(
+            TeXCalc,
+            self.directory.name,
+            destination=self.path('compiled'),
+            variables=('x',),
+            custom_processors=(FibonacciFunction,)
+        )
+
+        self.assertEqual(written, [self.path('compiled', 'fib.texc'), self.path('compiled', 'roots.texc')])
+        self.assertEqual(self.load('compiled', 'fib.texc')(x=9), (Decimal('34'),))
+        self.assertEqual(set(self.load('compiled', 'roots.texc')(a=1, b=-8, c=15)), {Decimal('3'), Decimal('5')})
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            precompile.main([
+                self.directory.name, '--variables', 'x', '--processor', 'TeXCalc.processors:FibonacciFunction'
+            ])
+
+        self.assertEqual(output.getvalue().split(), [self.path('fib.texc'), self.path('roots.texc')])
+        self.assertEqual(self.load('fib.texc')(x=9), (Decimal('34'),))
+
+        with self.assertRaises(TeXCalcException.SerializationError), contextlib.redirect_stdout(io.StringIO()):
+            precompile.main([self.directory.name])
+
+
 if __name__ == '__main__':
     unittest.main()
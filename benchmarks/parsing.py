@@ -0,0 +1,58 @@
+"""
+Shows how building of TeXCalc scales with a length of the expression, for the single pass parser and
+the old regex rewriting of the context map:
+
+    python -m benchmarks.parsing
+"""
+import time
+
+from TeXCalc import TeXCalc
+
+
+TERM = "\\frac{\\sin{a + %d} - \\sqrt{b^{2} + %d}}{(c + %d)(a - b)}"
+VARIABLES = ('a', 'b', 'c')
+
+
+def make_expression(terms):
+    return " + ".join([TERM % (i, i, i) for i in range(terms)])
+
+
+def build_parsed(expression):
+    return TeXCalc(expression, variables=VARIABLES)
+
+
+def build_rewritten(expression):
+    func = TeXCalc(expression, variables=VARIABLES, skip_context_processing=True)
+    func._TeXCalc__rewrite_context_map()
+    func.compile_context_map()
+    return func
+
+
+def measure(build, expression, repeat=3):
+    best = None
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build(expression)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main(sizes=(1, 2, 4, 8, 16, 32, 64, 128), rewriting_limit=32):
+    print(f"{'terms':>6} {'length':>8} {'parser, s':>12} {'rewriting, s':>14}")
+
+    for terms in sizes:
+        expression = make_expression(terms)
+        parsed = measure(build_parsed, expression)
+        rewritten = measure(build_rewritten, expression) if terms <= rewriting_limit else None
+
+        print(
+            f"{terms:>6} {len(expression):>8} {parsed:>12.5f} "
+            f"{(f'{rewritten:.5f}' if rewritten is not None else '-'):>14}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Measures TeXCalc on formulas from small to very large ones: building of an instance, the first call, a cached
+call, rows per second of calls and of TeXCalc.evaluate_batch(if numpy is installed), and peak memory. Results are
+written as JSON and may be compared with a stored baseline, then the exit code is 1 if any measure is worse than
+in the baseline by more than the tolerance:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.6
+
+Seconds depend on a machine and on its load, so each repetition of a timing goes between runs of a fixed
+calibration loop of Decimal arithmetic, and timings are compared as ratios to it(the 'calibrated' measures of
+a case). Ratios still differ between CPUs and python versions, so the baseline should be regenerated when they
+change:
+
+    python -m benchmarks.suite --output benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from decimal import Decimal
+from functools import partial
+
+from TeXCalc import TeXCalc, FibonacciFunction
+
+from .parsing import make_expression
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+DEFAULT_TOLERANCE = 0.5  # a relative regression of a calibrated measure, which fails the comparison
+DEFAULT_ROWS = 2000
+INSTANCES = 10  # instances built, or called the first time, per repetition
+
+QUADRATIC = "\\frac{-b \\pm \\sqrt{b^{2} - 4ac}}{2a}"
+TRIG_SUM = "2\\sin{\\frac{a + b}{2}}\\cos{\\frac{a - b}{2}}"
+FIB_LOG = "fib(x) - \\log_{2}{\\sqrt[3]{x - 1} + 2}"
+
+# name: (expression, variables, options of TeXCalc, a function of a row number, which returns a row, rows)
+CASES = {
+    'quadratic': (
+        QUADRATIC, ('a', 'b', 'c'), {},
+        lambda i: {'a': 1 + i % 3, 'b': -10 - i, 'c': 1 + i % 5},
+        DEFAULT_ROWS
+    ),
+    'trig-sum': (
+        TRIG_SUM, ('a', 'b'), {},
+        lambda i: {'a': i / 100, 'b': i / 50},
+        DEFAULT_ROWS
+    ),
+    'fib-log': (
+        FIB_LOG, ('x',), {'custom_processors': (FibonacciFunction,)},
+        lambda i: {'x': 2 + i % 80},  # fib(81) has 17 digits
+        DEFAULT_ROWS // 4
+    ),
+    'terms-8': (
+        make_expression(8), ('a', 'b', 'c'), {},
+        lambda i: {'a': i / 10, 'b': -i / 20 - 1, 'c': i / 30 + 1},
+        DEFAULT_ROWS // 8
+    ),
+    'terms-64': (
+        make_expression(64), ('a', 'b', 'c'), {},
+        lambda i: {'a': i / 10, 'b': -i / 20 - 1, 'c': i / 30 + 1},
+        DEFAULT_ROWS // 64
+    ),
+}
+
+# measures, where more is better, others are durations and sizes
+GREATER_IS_BETTER = ('rows_per_s', 'batch_rows_per_s')
+
+
+def calibration_loop():
+    """ A fixed workload of Decimal arithmetic and python calls, like computations of TeXCalc """
+    values = {}
+    total = Decimal(0)
+
+    for i in range(200):
+        total = values[i % 7] = (total + Decimal(i)) / 3
+
+    return total
+
+
+def best_of(function, repeat, number=1, prepare=None):
+    """
+    Returns the least duration of a call of the function, measured repeat times on number calls, and a ratio of
+    the median duration to the median duration of calibration_loop, which is timed before and after each
+    repetition, so both are timed in the same state of the machine. Prepare makes the function before each
+    repetition, untimed.
+    """
+    def calibrate():
+        return timeit.timeit(calibration_loop, number=10) / 10
+
+    durations, calibrations = [], [calibrate()]
+
+    for _ in range(repeat):
+        if prepare is not None:
+            function = prepare()
+
+        durations.append(timeit.timeit(function, number=number) / number)
+        calibrations.append(calibrate())
+
+    return min(durations), statistics.median(durations) / statistics.median(calibrations)
+
+
+def measure(expression, variables, options, make_row, rows, repeat=5):
+    """ Returns a dict of measures of the formula, see the docstring of the module """
+    def build():
+        return TeXCalc(expression, variables=variables, **options)
+
+    row = make_row(0)
+    results, calibrated = {}, {}
+
+    def add(name, timing, count=None):
+        """ Adds a duration, or a rate of count rows, if it's passed """
+        seconds, ratio = timing
+        results[name] = seconds if count is None else count / seconds
+        calibrated[name] = ratio if count is None else count / ratio
+
+    def first_calls():
+        calls = iter([partial(build(), **row) for _ in range(INSTANCES)])
+        return lambda: next(calls)()
+
+    add('construction_s', best_of(build, repeat, number=INSTANCES))
+    add('first_call_s', best_of(None, repeat, number=INSTANCES, prepare=first_calls))
+
+    func = build()
+    add('cached_call_s', best_of(lambda: func(**row), repeat, number=1000))
+
+    table = [make_row(i) for i in range(rows)]
+
+    def compute_rows():
+        func = build()
+        for row in table:
+            func(**row)
+
+    add('rows_per_s', best_of(compute_rows, repeat), count=rows)
+
+    tracemalloc.start()  # it slows computations down, so rows are computed again
+    compute_rows()
+    results['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if numpy is not None:
+        arrays = {name: numpy.array([row[name] for row in table], dtype=float) for name in variables}
+        func = build()
+        add('batch_rows_per_s', best_of(lambda: func.evaluate_batch(**arrays), repeat, number=10), count=rows)
+
+    results['calibrated'] = calibrated  # in durations of calibration_loop instead of seconds
+    return results
+
+
+def run(cases=None, repeat=5):
+    """ Returns JSON-compatible results of the cases(all of CASES by default) with a description of the machine """
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': numpy.__version__ if numpy is not None else None,
+        },
+        'results': {
+            name: measure(*CASES[name], repeat=repeat)
+            for name in cases or CASES.keys()
+        },
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Returns descriptions of regressions of results against the baseline, where a measure is worse by more than
+    the tolerance. Timings are compared by their calibrated measures, if both have them. Cases and measures, which
+    are absent in any of them, aren't compared.
+    """
+    regressions = []
+
+    for name, measures in baseline['results'].items():
+        actual_measures = results['results'].get(name, {})
+
+        for measure_name, expected in measures.items():
+            actual = actual_measures.get(measure_name, None)
+            unit = ""
+
+            if measure_name == 'calibrated':
+                continue
+
+            if measure_name in measures.get('calibrated', {}) and measure_name in actual_measures.get('calibrated', {}):
+                expected = measures['calibrated'][measure_name]
+                actual = actual_measures['calibrated'][measure_name]
+                unit = " calibrated"
+
+            if actual is None or expected is None or not expected:
+                continue
+
+            if measure_name in GREATER_IS_BETTER:
+                change = expected / actual - 1 if actual else float('inf')
+            else:
+                change = actual / expected - 1
+
+            if change > tolerance:
+                regressions.append(
+                    f"{name}.{measure_name}: {actual:.6g} against {expected:.6g}{unit} of the baseline, "
+                    f"{change:.0%} worse"
+                )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--output', help="a path of a JSON file to write results to, stdout by default")
+    parser.add_argument('--baseline', help="a path of a JSON file with results to compare with")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--case', action='append', choices=tuple(CASES.keys()), help="may be repeated, all by default")
+    arguments = parser.parse_args(argv)
+
+    results = run(arguments.case, repeat=arguments.repeat)
+    dumped = json.dumps(results, indent=2, sort_keys=True)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(dumped + '\n')
+    else:
+        print(dumped)
+
+    if not arguments.baseline:
+        return 0
+
+    with open(arguments.baseline) as file:
+        regressions = compare(results, json.load(file), arguments.tolerance)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
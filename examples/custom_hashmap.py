@@ -113,7 +113,7 @@ for var in variables.keys():
         k += 1
         index = k
 
-    hashmap[index] = var if var != 'e' else '2.7182818284'
+    hashmap[index] = var if var != 'e' else '\\e'
 
     for i, context in hashmap.items():
         if i == index:
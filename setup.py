@@ -51,7 +51,10 @@ setup(
     license='MIT',
     version=read("VERSION.txt"),
     platforms='all',
-    packages=find_packages(),
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*')),
+    extras_require={
+        'numpy': ['numpy'],
+    },
     author='Igor Nazarov',
     author_email='igoryan.ms@gmail.com',
     maintainer='Igor Nazarov',